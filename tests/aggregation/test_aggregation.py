@@ -0,0 +1,112 @@
+"""
+Test the 'aggregation' module.
+"""
+
+# built-in
+from collections import defaultdict
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns
+from unittest.mock import patch
+
+# module under test
+from yambs.aggregation import BySuffixPaths, collect_files, collect_roots
+
+
+def collect_files_recursive(root: Path) -> BySuffixPaths:
+    """The original (recursive, 'Path.iterdir' based) implementation."""
+
+    files: BySuffixPaths = defaultdict(set)
+
+    for item in root.iterdir():
+        if item.is_dir():
+            for suffix, found in collect_files_recursive(item).items():
+                files[suffix].update(found)
+        else:
+            files[item.suffix].add(item)
+
+    return files
+
+
+def create_tree(root: Path, depth: int, width: int, files: int) -> None:
+    """Create a synthetic source tree."""
+
+    root.mkdir(parents=True, exist_ok=True)
+
+    for idx in range(files):
+        root.joinpath(f"source{idx}.cc").touch()
+        root.joinpath(f"header{idx}.h").touch()
+
+    if depth:
+        for idx in range(width):
+            create_tree(root.joinpath(f"dir{idx}"), depth - 1, width, files)
+
+
+def test_collect_files_prune():
+    """Test that pruned directories aren't collected."""
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        create_tree(root, 2, 2, 1)
+
+        result = collect_files(root, prune={"dir1"})
+        assert root.joinpath("dir0", "dir0", "source0.cc") in result[".cc"]
+        assert all("dir1" not in str(x) for x in result[".cc"])
+
+        # Directories are treated as files when not recursing.
+        assert root.joinpath("dir1") in collect_files(root, recurse=False)[""]
+
+
+def test_collect_roots_parallel():
+    """Test that concurrent collection matches serial collection."""
+
+    with TemporaryDirectory() as tmp:
+        roots = []
+        for idx in range(4):
+            root = Path(tmp, f"root{idx}")
+            create_tree(root, 3, 2, 2)
+            roots.append((root, idx != 3))
+
+        expected = collect_roots(roots)
+        assert collect_roots(roots, jobs=4) == expected
+        assert Path(tmp, "root3", "dir0") in expected[""]
+
+
+def benchmark(root: Path) -> None:
+    """Compare file collection against the original implementation."""
+
+    with patch("os.stat", wraps=os.stat) as stat:
+        start = perf_counter_ns()
+        expected = collect_files_recursive(root)
+        original = perf_counter_ns() - start
+        original_stats = stat.call_count
+
+    with patch("os.stat", wraps=os.stat) as stat:
+        start = perf_counter_ns()
+        result = collect_files(root)
+        current = perf_counter_ns() - start
+        current_stats = stat.call_count
+
+    assert result == expected
+    assert current_stats < original_stats
+
+    print(
+        f"collect_files: {current / 1e6:.2f} ms, {current_stats} stat calls "
+        f"(original: {original / 1e6:.2f} ms, {original_stats} stat calls)"
+    )
+
+
+def test_collect_files_benchmark():
+    """Benchmark file collection on synthetic trees."""
+
+    with TemporaryDirectory() as tmp:
+        # A wide tree.
+        root = Path(tmp, "wide")
+        create_tree(root, 8, 2, 4)
+        benchmark(root)
+
+        # A deep tree.
+        root = Path(tmp, "deep")
+        create_tree(root, 48, 1, 16)
+        benchmark(root)
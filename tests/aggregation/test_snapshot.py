@@ -0,0 +1,61 @@
+"""
+Test the 'aggregation.snapshot' module.
+"""
+
+# built-in
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# module under test
+from yambs.aggregation import collect_files
+from yambs.aggregation.snapshot import SourceSnapshot
+
+
+def test_source_snapshot_basic():
+    """Test that snapshot-assisted collection matches a full scan."""
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp, "src")
+        for idx in range(3):
+            subdir = root.joinpath("a", f"b{idx}", "c")
+            subdir.mkdir(parents=True)
+            subdir.joinpath(f"source{idx}.cc").touch()
+            subdir.parent.joinpath(f"header{idx}.h").touch()
+
+        path = Path(tmp, "snapshot.json")
+
+        # A missing snapshot isn't decoded.
+        with patch("yambs.aggregation.snapshot.ARBITER.decode") as decode:
+            snapshot = SourceSnapshot(path, racy_ns=0)
+            decode.assert_not_called()
+        assert collect_files(root, snapshot=snapshot) == collect_files(root)
+        assert snapshot.hits == 0
+        snapshot.save()
+
+        # Nothing changed, every listing should be re-used.
+        snapshot = SourceSnapshot(path, racy_ns=0)
+        assert collect_files(root, snapshot=snapshot) == collect_files(root)
+        assert snapshot.misses == 0
+        snapshot.save()
+
+        # Only the modified directory should be listed again.
+        root.joinpath("a", "b1", "c", "new.c").touch()
+        snapshot = SourceSnapshot(path, racy_ns=0)
+        assert collect_files(root, snapshot=snapshot) == collect_files(root)
+        assert snapshot.misses == 1
+
+        # Recently modified directories aren't trusted.
+        snapshot.save()
+        snapshot = SourceSnapshot(path)
+        assert collect_files(root, snapshot=snapshot) == collect_files(root)
+        snapshot.save()
+        snapshot = SourceSnapshot(path)
+        collect_files(root, snapshot=snapshot)
+        assert snapshot.hits == 0
+
+        # Non-recursive collection.
+        snapshot = SourceSnapshot(path, racy_ns=0)
+        assert collect_files(
+            root, recurse=False, snapshot=snapshot
+        ) == collect_files(root, recurse=False)
@@ -0,0 +1,28 @@
+"""
+Test the 'commands.cache' module.
+"""
+
+# built-in
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# module under test
+from yambs import PKG_NAME
+from yambs.entry import main as yambs_main
+
+
+def test_cache_command_basic():
+    """Test the 'cache' command."""
+
+    with TemporaryDirectory() as tmp:
+        entry = Path(tmp, PKG_NAME, "artifacts", "digest")
+        entry.mkdir(parents=True)
+        entry.joinpath("data").write_bytes(bytes(1024))
+
+        with patch.dict("os.environ", {"XDG_CACHE_HOME": tmp}):
+            assert yambs_main([PKG_NAME, "cache"]) == 0
+            assert entry.is_dir()
+
+            assert yambs_main([PKG_NAME, "cache", "-s", "0"]) == 0
+            assert not entry.is_dir()
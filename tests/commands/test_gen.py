@@ -2,12 +2,21 @@
 Test the 'commands.gen' module.
 """
 
+# built-in
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+# third-party
+from vcorelib.paths import find_file
+
 # internal
 from tests.resources import clean_scenario
 
 # module under test
 from yambs import PKG_NAME
 from yambs.entry import main as yambs_main
+from yambs.paths import read_depfile
 
 
 def test_gen_command_basic():
@@ -17,3 +26,56 @@ def test_gen_command_basic():
 
     assert yambs_main([PKG_NAME, "-C", path, "gen", "-w", "-i"]) == 0
     assert yambs_main([PKG_NAME, "-C", path, "gen"]) == 0
+
+
+def test_gen_command_uf2_batch():
+    """Test generating batched UF2 conversion edges."""
+
+    path = clean_scenario("sample")
+    config = str(path.joinpath("uf2_batch.yaml"))
+
+    assert yambs_main([PKG_NAME, "-C", str(path), "gen", "-c", config]) == 0
+
+    apps = Path(path, "ninja", "boards", "native", "apps.ninja").read_text(
+        encoding="utf-8"
+    )
+    assert ": uf2_batch $build_dir/apps/common/native/test1.hex" in apps
+    assert ": uf2 " not in apps
+
+
+def test_gen_command_compiled_config():
+    """Test generating from up-to-date 'compile_config' output."""
+
+    path = clean_scenario("sample")
+    config = path.joinpath("yambs.yaml")
+    compiled = path.joinpath("build", "compiled_config.json")
+    compiled.parent.mkdir(parents=True, exist_ok=True)
+
+    src_config = find_file("yambs.yaml", package=PKG_NAME)
+    assert src_config is not None
+
+    args = [PKG_NAME, "compile_config", "-e", "-k", "-d"]
+    args += [str(compiled), str(src_config), str(config)]
+    assert yambs_main(args) == 0
+
+    # The output must be newer than every input.
+    inputs = read_depfile(compiled)
+    assert inputs
+    newest = max(x.stat().st_mtime_ns for x in inputs)
+    os.utime(compiled, ns=(newest + 1, newest + 1))
+
+    with patch("yambs.config.common.merge") as merge:
+        assert (
+            yambs_main(
+                [
+                    PKG_NAME,
+                    "-C",
+                    str(path),
+                    "gen",
+                    "--compiled-config",
+                    str(compiled),
+                ]
+            )
+            == 0
+        )
+        merge.assert_not_called()
@@ -3,8 +3,11 @@ Test the 'commands.native' module.
 """
 
 # built-in
+import os
+from pathlib import Path
 from shutil import which
 from subprocess import run
+import sys
 from sys import platform
 
 # third-party
@@ -18,12 +21,82 @@ from yambs import PKG_NAME
 from yambs.entry import main as yambs_main
 
 
+def generated_mtimes() -> dict[Path, int]:
+    """Get modification times for generated files."""
+
+    return {
+        path: path.stat().st_mtime_ns
+        for path in [Path("build.ninja"), *Path("ninja").rglob("*")]
+        if path.is_file()
+    }
+
+
 def test_native_command_wasm():
     """Test the 'native' command with WASM variants."""
 
     with in_dir(clean_scenario("native3")):
         assert yambs_main([PKG_NAME, "native"]) == 0
 
+        # Generated files shouldn't be re-written if nothing changed.
+        mtimes = generated_mtimes()
+        assert yambs_main([PKG_NAME, "native", "-j", "2"]) == 0
+        assert generated_mtimes() == mtimes
+
+        # Try to build (if we can).
+        if platform == "linux" and which("ninja"):
+            run(["ninja", "wasm"], check=True)
+
+
+def generated_contents() -> dict[Path, bytes]:
+    """Get the contents of generated files."""
+
+    return {
+        path: path.read_bytes()
+        for path in [Path("build.ninja"), *Path("ninja").rglob("*")]
+        if path.is_file()
+    }
+
+
+def test_native_command_deterministic():
+    """Test that generated files don't depend on the hash seed."""
+
+    with in_dir(clean_scenario("native3")):
+        contents = []
+        for seed in ["1", "2"]:
+            run(
+                [sys.executable, "-m", PKG_NAME, "native", "-n"],
+                check=True,
+                env={**os.environ, "PYTHONHASHSEED": seed},
+            )
+            contents.append(generated_contents())
+
+        assert contents[0] == contents[1]
+
+
+def test_native_command_link_library():
+    """Test linking applications against the project's static libraries."""
+
+    with in_dir(clean_scenario("native4")):
+        assert yambs_main([PKG_NAME, "native"]) == 0
+
+        apps = Path("ninja", "apps.ninja").read_text(encoding="utf-8")
+        assert "link_whole $build_dir/apps/test_app4.o" in apps
+        assert "link_no_map_whole $build_dir/apps/test_app4.wasm" in apps
+        assert "$build_dir/yambs4-0.1.0.wasm.a: ar" in apps
+
+        # Archives are re-created (not updated) so they never keep objects
+        # from removed sources.
+        rules = Path("ninja", "rules.ninja").read_text(encoding="utf-8")
+        assert "command = rm -f $out && ar rcs $out $in" in rules
+
+        # Library objects are only listed by the archive rules.
+        assert apps.count("$build_dir/sample2.o") == 1
+
+        # UF2 images are converted by a single (batched) edge.
+        assert ": uf2_batch $build_dir/apps/test_app4.hex" in apps
+        assert ": uf2 " not in apps
+        assert "mbs uf2conv -f RP2040 -B $in" in rules
+
         # Try to build (if we can).
         if platform == "linux" and which("ninja"):
             run(["ninja", "wasm"], check=True)
@@ -2,7 +2,15 @@
 Test the 'commands.uf2conv' module.
 """
 
+# built-in
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from typing import Any, Dict
+
 # third-party
+from pytest import raises
+from vcorelib.io import ARBITER
 from vcorelib.paths.context import tempfile
 
 # internal
@@ -11,6 +19,7 @@ from tests.resources import resource
 # module under test
 from yambs import PKG_NAME
 from yambs.entry import main as yambs_main
+from yambs.uf2 import convert_file
 
 
 def test_uf2conv_basic():
@@ -63,3 +72,72 @@ def test_uf2conv_basic():
             )
             == 0
         )
+
+
+def test_uf2conv_batch():
+    """Test converting many images in one process."""
+
+    base = [PKG_NAME, "uf2conv", "-f", "RP2040"]
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+
+        inputs = []
+        for name in ["a.hex", "b.bin", "c/d.hex", "e.hex"]:
+            path = root.joinpath(name)
+            path.parent.mkdir(exist_ok=True)
+            copyfile(resource(f"test1{path.suffix}"), path)
+            inputs.append(path)
+
+        # Only one input is allowed without batch mode.
+        assert yambs_main(base + [str(x) for x in inputs[:2]]) != 0
+
+        assert yambs_main(base + ["-B"] + [str(x) for x in inputs[:2]]) == 0
+
+        # Application manifests.
+        apps = root.joinpath("apps.json")
+        manifest: Dict[str, Any] = {
+            "all": {
+                "d": {
+                    "source": "d.cc",
+                    "variants": {"debug": str(root.joinpath("c/d.elf"))},
+                },
+                # Not built.
+                "f": {"source": "f.cc", "variants": {"debug": "f.elf"}},
+            },
+            "tests": [],
+        }
+        ARBITER.encode(apps, manifest)
+        board_apps = root.joinpath("board_apps.json")
+        ARBITER.encode(board_apps, {"board": {"e": str(root.joinpath("e"))}})
+
+        assert yambs_main(base + ["-m", str(apps), "-j", "1"]) == 0
+        assert yambs_main(base + ["-m", str(board_apps)]) == 0
+
+        for path in inputs:
+            result = path.with_suffix(".uf2")
+            expected = root.joinpath("expected.uf2")
+            convert_file(str(path), str(expected), family_id=0xE48BFF56)
+            assert result.read_bytes() == expected.read_bytes()
+
+        assert not root.joinpath("f.uf2").exists()
+
+        # UF2 images aren't converted (again).
+        image = resource("pi_pico_circuitpython.uf2").read_bytes()
+        for name in ["g.uf2", "h.bin"]:
+            root.joinpath(name).write_bytes(image)
+        args = [str(root.joinpath(x)) for x in ["g.uf2", "h.bin"]]
+        assert yambs_main(base + ["-B"] + args) == 0
+        assert root.joinpath("g.uf2").read_bytes() == image
+        assert not root.joinpath("h.uf2").exists()
+        with raises(ValueError):
+            convert_file(args[1], str(root.joinpath("h.uf2")))
+
+        # HEX files without any data records have no start address.
+        empty = root.joinpath("empty.hex")
+        empty.write_text(":00000001FF\n", encoding="utf-8")
+        assert yambs_main(base + ["-B", str(empty)]) == 0
+        assert root.joinpath("empty.uf2").read_bytes() == b""
+        assert (
+            yambs_main(base + ["-o", str(root.joinpath("x")), str(empty)]) == 0
+        )
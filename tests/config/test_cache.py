@@ -0,0 +1,176 @@
+"""
+Test the 'config.cache' module.
+"""
+
+# built-in
+from contextlib import contextmanager
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator
+from unittest.mock import patch
+
+# third-party
+from vcorelib.dict import merge as merge_data
+from vcorelib.io import ARBITER
+from vcorelib.paths import find_file
+
+# module under test
+from yambs import PKG_NAME
+from yambs.config.cache import ConfigCache
+from yambs.config.native import load_native
+from yambs.entry import main as yambs_main
+from yambs.schemas import PackageSchemaMap
+
+
+def set_mtime(path: Path, offset_s: int) -> None:
+    """Move a file's modification time into the past."""
+
+    mtime = path.stat().st_mtime_ns - offset_s * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+@contextmanager
+def raw_includes() -> Iterator[None]:
+    """
+    Also record includes by their raw (relative) name, like some versions of
+    'vcorelib' do.
+    """
+
+    original = ARBITER.decode
+
+    def decode(*args, **kwargs):
+        """Decode data."""
+
+        files_loaded = kwargs.get("files_loaded")
+        result = original(*args, **kwargs)
+        if files_loaded is not None:
+            files_loaded.append(Path("include.yaml"))
+        return result
+
+    with patch.object(ARBITER, "decode", decode):
+        yield
+
+
+def test_config_cache_basic():
+    """Test that merged configuration data is re-used until files change."""
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        config = root.joinpath("yambs.yaml")
+        include = root.joinpath("include.yaml")
+
+        config.write_text(
+            "includes: [include.yaml]\nproject: {name: a}\n", encoding="utf-8"
+        )
+        include.write_text("default_target: a\n", encoding="utf-8")
+
+        with (
+            patch.dict("os.environ", {"XDG_CACHE_HOME": str(root)}),
+            raw_includes(),
+        ):
+            # Recently modified files aren't trusted.
+            assert load_native(path=config).data["default_target"] == "a"
+            assert not list(root.joinpath("yambs", "configs").glob("*"))
+
+            set_mtime(config, 10)
+            set_mtime(include, 10)
+
+            expected = load_native(path=config)
+            assert list(root.joinpath("yambs", "configs").glob("*"))
+
+            # Cached data shouldn't need to be loaded (or validated) again.
+            with patch("yambs.config.common.merge") as merge:
+                result = load_native(path=config)
+                merge.assert_not_called()
+            assert result.data == expected.data
+
+            # Key order is preserved.
+            assert list(result.data["variants"]) == list(
+                expected.data["variants"]
+            )
+            assert result.file == config
+
+            # Data cached for different schemas (defaults) isn't re-used.
+            with (
+                patch.object(PackageSchemaMap, "digest", "0" * 64),
+                patch(
+                    "yambs.config.common.merge", wraps=merge_data
+                ) as wrapped,
+            ):
+                assert load_native(path=config).data == expected.data
+                wrapped.assert_called()
+
+            # Changing an included file invalidates the cache.
+            include.write_text("default_target: b\n", encoding="utf-8")
+            set_mtime(include, 5)
+            assert load_native(path=config).data["default_target"] == "b"
+
+
+def test_config_cache_unwritable():
+    """Test that failing to write the cache isn't an error."""
+
+    with TemporaryDirectory() as tmp:
+        config = Path(tmp, "yambs.yaml")
+        config.write_text("project: {name: a}\n", encoding="utf-8")
+        set_mtime(config, 10)
+
+        cache = ConfigCache("test")
+        with patch(
+            "yambs.config.cache.encode_if_changed", side_effect=OSError
+        ):
+            assert not cache.save([config], {"a": 1})
+        assert cache.save([config], {"a": 1})
+        assert cache.load() == {"a": 1}
+
+
+def test_config_compiled_fast_path():
+    """Test that up-to-date 'compile_config' output is loaded directly."""
+
+    src_config = find_file("native.yaml", package=PKG_NAME)
+    assert src_config is not None
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        config = root.joinpath("yambs.yaml")
+        include = root.joinpath("include.yaml")
+        compiled = root.joinpath("compiled_config.json")
+
+        config.write_text(
+            "includes: [include.yaml]\nproject: {name: a}\n", encoding="utf-8"
+        )
+        include.write_text("default_target: a\n", encoding="utf-8")
+
+        with (
+            patch.dict("os.environ", {"XDG_CACHE_HOME": str(root)}),
+            raw_includes(),
+        ):
+            expected = load_native(path=config)
+
+            # Missing output (and a missing dependency file) is ignored.
+            assert load_native(path=config, compiled=compiled).data == (
+                expected.data
+            )
+
+            set_mtime(config, 10)
+            set_mtime(include, 10)
+
+            args = [PKG_NAME, "compile_config", "-e", "-k", "-d"]
+            args += [str(compiled), str(src_config), str(config)]
+            assert yambs_main(args) == 0
+
+            with patch("yambs.config.common.merge") as merge:
+                result = load_native(path=config, compiled=compiled)
+                merge.assert_not_called()
+
+            assert result.data == expected.data
+            assert list(result.data["variants"]) == list(
+                expected.data["variants"]
+            )
+
+            # Output older than any of its inputs isn't used.
+            include.write_text("default_target: b\n", encoding="utf-8")
+            set_mtime(include, 5)
+            set_mtime(compiled, 20)
+            result = load_native(path=config, compiled=compiled)
+            assert result.data["default_target"] == "b"
@@ -6,8 +6,8 @@ Test the 'config.native' module.
 from tests.resources import resource
 
 # module under test
-from yambs.config.common import DEFAULT_CONFIG
 from yambs.config.native import load_native
+from yambs.defaults import DEFAULT_CONFIG
 
 
 def test_native_config_basic():
@@ -0,0 +1,34 @@
+"""
+Test configuration (shared fixtures).
+"""
+
+# built-in
+from pathlib import Path
+from typing import Iterator
+
+# third-party
+from pytest import MonkeyPatch, fixture
+
+# internal
+from yambs import VERSION
+from yambs.generate.common import get_jinja
+from yambs.paths import user_cache_dir
+from yambs.schemas import PACKAGE_SCHEMAS
+
+
+@fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[Path]:
+    """Keep tests from using (or leaving files in) the real cache."""
+
+    cache = tmp_path.joinpath("cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache))
+
+    # Some caches are only located once (on import, or when first used).
+    monkeypatch.setattr(
+        PACKAGE_SCHEMAS, "cache", user_cache_dir("schemas", VERSION)
+    )
+    get_jinja.cache_clear()
+
+    yield cache
+
+    get_jinja.cache_clear()
@@ -0,0 +1,236 @@
+"""
+Test the 'dependency.cache' module.
+"""
+
+# built-in
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler
+from io import BytesIO
+import os
+from pathlib import Path
+import tarfile
+from tempfile import TemporaryDirectory
+from time import sleep
+from typing import List
+
+# third-party
+from pytest import raises
+
+# internal
+from tests.resources import http_server
+
+# module under test
+from yambs.dependency.cache import (
+    ArtifactCache,
+    extract_verified,
+    file_lock,
+)
+from yambs.dependency.handlers.yambs.github import audit_extract
+
+SLUG = "project-1.0.0"
+
+
+def make_archive() -> bytes:
+    """Create a release archive."""
+
+    stream = BytesIO()
+    with tarfile.open(fileobj=stream, mode="w:xz") as tar:
+        for name, data in [
+            ("src/main.cc", b"int main() { return 0; }\n"),
+            ("ninja/compiled_config.json", b"{}\n"),
+        ]:
+            info = tarfile.TarInfo(f"{SLUG}/{name}")
+            info.size = len(data)
+            tar.addfile(info, BytesIO(data))
+    return stream.getvalue()
+
+
+ARCHIVE = make_archive()
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """A stand-in for a release-asset server."""
+
+    requests: List[str] = []
+
+    def log_message(self, *_) -> None:  # pylint: disable=arguments-differ
+        """Don't log requests."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a request."""
+
+        type(self).requests.append(self.path)
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(ARCHIVE)))
+        self.end_headers()
+        self.wfile.write(ARCHIVE)
+
+
+def test_audit_extract_shared_cache():
+    """Test that release archives are shared between projects."""
+
+    digest = sha256(ARCHIVE).hexdigest()
+
+    with http_server(ArchiveHandler) as url, TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        cache = ArtifactCache(root.joinpath("cache"))
+
+        results = []
+        for project in ["a", "b"]:
+            third_party = root.joinpath(project)
+            third_party.mkdir()
+
+            sums = third_party.joinpath(f"{SLUG}.tar.xz.sha256sum")
+            sums.write_text(f"{digest}  {SLUG}.tar.xz\n", encoding="utf-8")
+
+            data = {
+                "version": "1.0.0",
+                "assets": {
+                    "sum": str(sums),
+                    ".tar.xz": str(third_party.joinpath(f"{SLUG}.tar.xz")),
+                    "url": f"{url}/{SLUG}.tar.xz",
+                },
+            }
+
+            results.append(audit_extract(data, cache=cache))
+            assert data["name"] == "project"
+
+        # The archive was only downloaded (and extracted) once.
+        assert ArchiveHandler.requests == [f"/{SLUG}.tar.xz"]
+        assert [x.path.name for x in cache.entries()] == [digest]
+
+        # Projects get their own (linked) copy of the sources.
+        sources = [x.joinpath("src", "main.cc") for x in results]
+        assert sources[0].read_bytes() == sources[1].read_bytes()
+        assert sources[0].resolve() != sources[1].resolve()
+        assert sources[0].stat().st_ino == sources[1].stat().st_ino
+
+        # Files that builds write to are copied.
+        configs = [
+            x.joinpath("ninja", "compiled_config.json") for x in results
+        ]
+        assert configs[0].stat().st_ino != configs[1].stat().st_ino
+        configs[0].write_text('{"a": 1}\n', encoding="utf-8")
+        assert configs[1].read_text(encoding="utf-8") == "{}\n"
+
+
+def test_artifact_cache_evict():
+    """Test evicting least-recently used cache entries."""
+
+    with TemporaryDirectory() as tmp:
+        cache = ArtifactCache(Path(tmp))
+        assert not cache.evict(0)
+
+        for idx, name in enumerate(["b", "a", "c"]):
+            entry = cache.entry(name)
+            entry.mkdir()
+            entry.joinpath("data").write_bytes(bytes(100))
+
+            mtime = 1_000_000_000 * (idx + 1)
+            os.utime(entry, ns=(mtime, mtime))
+
+        assert [x.path.name for x in cache.entries()] == ["b", "a", "c"]
+
+        assert not cache.evict(300)
+
+        # Entries in use aren't evicted until they're no longer used.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with cache.locked("b"):
+                result = executor.submit(cache.evict, 150)
+                sleep(0.1)
+                assert not result.done()
+                assert cache.entry("b").is_dir()
+
+            assert [x.path.name for x in result.result()] == ["b", "a"]
+
+        # Lock files are removed along with their entries.
+        assert [x.name for x in Path(tmp).iterdir()] == ["c"]
+        assert [x.path.name for x in cache.entries()] == ["c"]
+
+
+def test_file_lock_removed():
+    """Test waiting on a lock file that its holder removes."""
+
+    def hold(path: Path) -> bool:
+        """Lock a file (and check that it still exists)."""
+
+        with file_lock(path):
+            return path.is_file()
+
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp, "test.lock")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with file_lock(path):
+                result = executor.submit(hold, path)
+                sleep(0.1)
+                path.unlink()
+
+            # The waiter locks a new file.
+            assert result.result()
+
+
+def test_artifact_cache_concurrent():
+    """Test populating the same cache entry concurrently."""
+
+    digest = sha256(ARCHIVE).hexdigest()
+    downloads = []
+
+    def download(path: Path) -> None:
+        """Download the archive (slowly)."""
+
+        downloads.append(path)
+        with path.open("wb") as path_fd:
+            for idx in range(0, len(ARCHIVE), 64):
+                path_fd.write(ARCHIVE[idx : idx + 64])
+                sleep(0.001)
+
+    with TemporaryDirectory() as tmp:
+        cache = ArtifactCache(Path(tmp))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = [
+                x.result()
+                for x in [
+                    executor.submit(
+                        cache.ensure, digest, f"{SLUG}.tar.xz", SLUG, download
+                    )
+                    for _ in range(4)
+                ]
+            ]
+
+        assert len(downloads) == 1
+        assert len(set(results)) == 1
+        assert results[0].joinpath("src", "main.cc").is_file()
+
+
+def test_extract_verified():
+    """Test extracting archives while verifying their digest."""
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        archive = root.joinpath("archive.tar.xz")
+        archive.write_bytes(ARCHIVE)
+
+        dst = root.joinpath("out")
+        extract_verified(archive, dst, sha256(ARCHIVE).hexdigest())
+        assert dst.joinpath(SLUG, "src", "main.cc").is_file()
+
+        # Nothing is left behind if the digest doesn't match.
+        dst = root.joinpath("bad")
+        with raises(ValueError):
+            extract_verified(archive, dst, "0" * 64)
+        assert not dst.exists()
+
+        # Corrupt downloads aren't kept in the cache.
+        cache = ArtifactCache(root.joinpath("cache"))
+        with raises(ValueError):
+            cache.ensure(
+                "0" * 64,
+                archive.name,
+                SLUG,
+                lambda path: path.write_bytes(ARCHIVE),
+            )
+        assert not list(cache.entry("0" * 64).iterdir())
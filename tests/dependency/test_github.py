@@ -2,14 +2,186 @@
 Test the 'dependency.github' module.
 """
 
+# built-in
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler
+from io import BytesIO
+from pathlib import Path
+import tarfile
+from tempfile import TemporaryDirectory
+from threading import Barrier
+from typing import List, Optional
+from unittest.mock import patch
+
+# third-party
+from pytest import raises
+
 # internal
-from tests.resources import OWNER, REPO
+from tests.resources import OWNER, REPO, http_server
 
 # module under test
-from yambs.dependency.github import GithubDependency
+from yambs.dependency.github import (
+    GithubDependency,
+    default_filt,
+    download_file_if_missing,
+    ensure_extracted,
+    partial_path,
+)
+
+ASSET = bytes(range(256)) * 100
 
 
 def test_github_dependency_basic():
     """Test basic interactions with a GitHub dependency."""
 
     assert GithubDependency(OWNER, REPO)
+
+
+class AssetHandler(BaseHTTPRequestHandler):
+    """A stand-in for a release-asset server."""
+
+    ranges: List[Optional[str]] = []
+
+    def log_message(self, *_) -> None:  # pylint: disable=arguments-differ
+        """Don't log requests."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a request."""
+
+        body = ASSET
+        status = 200
+
+        request_range = self.headers.get("Range")
+        type(self).ranges.append(request_range)
+
+        if request_range and self.path != "/no-range":
+            start = int(request_range[len("bytes=") : -1])
+            status = 206 if start < len(ASSET) else 416
+            body = ASSET[start:]
+
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_download_file_if_missing():
+    """Test streaming, resumable and verified downloads."""
+
+    digest = f"sha256:{sha256(ASSET).hexdigest()}"
+
+    with http_server(AssetHandler) as url, TemporaryDirectory() as tmp:
+        dest = Path(tmp, "asset.bin")
+        part = partial_path(dest)
+
+        assert download_file_if_missing(
+            f"{url}/asset", dest, digest=digest, chunk_size=1000
+        )
+        assert dest.read_bytes() == ASSET
+        assert not part.exists()
+        assert not download_file_if_missing(f"{url}/asset", dest)
+
+        # Partial downloads are resumed (or restarted if ranges aren't
+        # supported).
+        for path in ["/asset", "/no-range"]:
+            dest.unlink()
+            part.write_bytes(ASSET[:1234])
+            assert download_file_if_missing(
+                f"{url}{path}", dest, digest=digest
+            )
+            assert AssetHandler.ranges[-1] == "bytes=1234-"
+            assert dest.read_bytes() == ASSET
+
+        # A partial file may already be complete.
+        dest.unlink()
+        part.write_bytes(ASSET)
+        assert download_file_if_missing(f"{url}/asset", dest, digest=digest)
+        assert dest.read_bytes() == ASSET
+
+        # Without a digest, a partial file that can't be resumed is
+        # downloaded again.
+        dest.unlink()
+        part.write_bytes(bytes(len(ASSET)))
+        assert download_file_if_missing(f"{url}/asset", dest)
+        assert dest.read_bytes() == ASSET
+        assert not part.exists()
+
+        # Corrupt data isn't kept.
+        dest.unlink()
+        with raises(ValueError):
+            download_file_if_missing(
+                f"{url}/asset", dest, digest=f"sha256:{'0' * 64}"
+            )
+        assert not dest.exists()
+        assert not part.exists()
+
+
+def make_archive(name: str) -> bytes:
+    """Create an archive containing a single directory."""
+
+    stream = BytesIO()
+    with tarfile.open(fileobj=stream, mode="w:xz") as tar:
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.DIRTYPE
+        tar.addfile(info)
+    return stream.getvalue()
+
+
+ARCHIVES = {f"{name}.tar.xz": make_archive(name) for name in ["a", "b"]}
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """A stand-in for a release-asset server (requiring concurrency)."""
+
+    barrier = Barrier(2, timeout=5)
+
+    def log_message(self, *_) -> None:  # pylint: disable=arguments-differ
+        """Don't log requests."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a request."""
+
+        # Both assets must be requested at the same time.
+        self.barrier.wait()
+
+        body = ARCHIVES[self.path[1:]]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_download_release_assets_concurrent():
+    """Test that release assets are downloaded concurrently."""
+
+    with http_server(ReleaseHandler) as url, TemporaryDirectory() as tmp:
+        dep = GithubDependency(
+            OWNER,
+            REPO,
+            data={
+                "name": "test",
+                "html_url": url,
+                "assets": [
+                    {
+                        "name": name,
+                        "browser_download_url": f"{url}/{name}",
+                        "digest": f"sha256:{sha256(data).hexdigest()}",
+                    }
+                    for name, data in ARCHIVES.items()
+                ],
+            },
+        )
+
+        output = Path(tmp)
+        with patch(
+            "yambs.dependency.github.ensure_extracted",
+            side_effect=ensure_extracted,
+        ) as extract:
+            dep.download_release_assets(default_filt(output), jobs=2)
+
+            # Archives are only extracted once per directory.
+            extract.assert_called_once()
+
+        for name in ["a", "b"]:
+            assert output.joinpath(name).is_dir()
+            assert output.joinpath(f"{name}.tar.xz").is_file()
@@ -4,10 +4,24 @@ Test the 'dependency.manager' module.
 
 # built-in
 from pathlib import Path
+from shutil import copytree
 from tempfile import TemporaryDirectory
+from threading import Barrier
+from typing import List
+from unittest.mock import patch
+
+# third-party
+from vcorelib.io import ARBITER
+
+# internal
+from tests.resources import clean_scenario
 
 # module under test
-from yambs.dependency.manager import DependencyManager
+from yambs.dependency.config import Dependency, DependencyKind
+from yambs.dependency.handlers.types import DependencyTask
+from yambs.dependency.handlers.yambs import yambs_handler
+from yambs.dependency.manager import DependencyManager, ThirdPartyBuild
+from yambs.dependency.state import DependencyState
 
 
 def test_dependency_manager_basic():
@@ -16,3 +30,230 @@ def test_dependency_manager_basic():
     with TemporaryDirectory() as tmp:
         tmp_path = Path(tmp)
         assert DependencyManager(tmp_path, tmp_path)
+
+
+def make_dep(name: str) -> Dependency:
+    """Create a directory-sourced dependency."""
+
+    return Dependency.create({"kind": "yambs", "directory": name})
+
+
+def test_dependency_manager_audit_all():
+    """Test that dependency levels are resolved concurrently."""
+
+    graph = {
+        "a": ["c", "d"],
+        "b": ["d", "e"],
+        "c": [],
+        "d": ["a"],
+        "e": [],
+    }
+    handled: List[str] = []
+
+    # Every dependency in a level should be handled before any finishes.
+    barrier = Barrier(2, timeout=5)
+
+    def handler(task: DependencyTask) -> DependencyState:
+        """A simple dependency handler."""
+
+        name = str(task.dep)
+        handled.append(name)
+
+        if name in ("a", "b"):
+            barrier.wait()
+
+        task.compile_flags.append(f"-I{name}")
+        task.link_flags.append(f"-l{name}")
+        task.build_commands.append(["build", name])
+        task.source_dirs.add(Path(name))
+        task.nested.update(make_dep(x) for x in graph[name])
+
+        return task.current
+
+    with TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        manager = DependencyManager(tmp_path, tmp_path)
+
+        with patch.dict(
+            "yambs.dependency.manager.HANDLERS",
+            {DependencyKind.YAMBS: handler},
+        ):
+            states = manager.audit_all(
+                [make_dep("b"), make_dep("a"), make_dep("a")], jobs=2
+            )
+
+        # Every dependency is only handled once.
+        assert sorted(handled) == ["a", "b", "c", "d", "e"]
+        assert len(states) == 5
+
+        # Results are merged breadth-first, in a stable order.
+        assert manager.compile_flags[2:] == [
+            "-Ia",
+            "-Ib",
+            "-Ic",
+            "-Id",
+            "-Ie",
+        ]
+        assert manager.link_flags[1:] == ["-la", "-lb", "-lc", "-ld", "-le"]
+        assert manager.builds[0][1] == [["build", "a"]]
+        assert len(manager.source_dirs) == 5
+        assert manager.handler_data(make_dep("a"))["state"] == "init"
+
+        # Resolved dependencies aren't handled again.
+        with patch.dict(
+            "yambs.dependency.manager.HANDLERS",
+            {DependencyKind.YAMBS: handler},
+        ):
+            assert manager.audit(make_dep("a")) == DependencyState.INIT
+        assert len(handled) == 5
+
+
+def test_dependency_manager_third_party_ninja():
+    """Test that third-party builds are ordered by the dependency graph."""
+
+    graph = {"a": ["b", "c"], "b": ["c"], "c": []}
+
+    def handler(task: DependencyTask) -> DependencyState:
+        """A simple dependency handler."""
+
+        name = str(task.dep)
+        task.data["static_library"] = f"/{name}/lib{name}.a"
+
+        # Pretend that 'b' is already built.
+        if name != "b":
+            task.build_commands.append(["ninja", "-C", f"/{name}", "$lib"])
+
+        task.nested.update(make_dep(x) for x in graph[name])
+        return task.current
+
+    with TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        manager = DependencyManager(tmp_path, tmp_path)
+
+        with patch.dict(
+            "yambs.dependency.manager.HANDLERS",
+            {DependencyKind.YAMBS: handler},
+        ):
+            manager.audit(make_dep("a"))
+
+        assert manager.third_party_builds() == [
+            ThirdPartyBuild(
+                "/a/liba.a", [["ninja", "-C", "/a", "$lib"]], ["/c/libc.a"]
+            ),
+            ThirdPartyBuild("/c/libc.a", [["ninja", "-C", "/c", "$lib"]], []),
+        ]
+
+        path = tmp_path.joinpath("third_party.ninja")
+        manager.save(path, depth=2)
+        contents = path.read_text(encoding="utf-8")
+
+        assert "  depth = 2\n" in contents
+        assert "build /a/liba.a: third_party || /c/libc.a\n" in contents
+        assert "  cmd = ninja -C /a $$lib\n" in contents
+        assert "build third_party: phony /a/liba.a /c/libc.a\n" in contents
+
+
+def test_dependency_manager_fingerprints():
+    """Test that unchanged dependencies aren't handled again."""
+
+    directory = clean_scenario("native3")
+    project_root = directory.parent
+    dep = make_dep(str(directory))
+
+    calls: List[str] = []
+
+    def handler(task: DependencyTask) -> DependencyState:
+        """Keep track of handler calls."""
+
+        calls.append(str(task.dep))
+        return yambs_handler(task)
+
+    with TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+
+        def audit() -> DependencyManager:
+            """Audit the dependency with a new manager."""
+
+            manager = DependencyManager(tmp_path, project_root)
+            with patch.dict(
+                "yambs.dependency.manager.HANDLERS",
+                {DependencyKind.YAMBS: handler},
+            ):
+                manager.audit(dep)
+            manager.save(tmp_path.joinpath("third_party.ninja"))
+            return manager
+
+        first = audit()
+        assert len(calls) == 1
+
+        # Outputs are restored from the previous run.
+        second = audit()
+        assert len(calls) == 1
+        assert second.compile_flags == first.compile_flags
+        assert second.link_flags == first.link_flags
+        assert second.source_dirs == first.source_dirs
+        assert first.third_party_builds()
+        assert second.third_party_builds() == first.third_party_builds()
+
+        # Changes to the dependency's state cause it to be handled again.
+        tmp_path.joinpath("include", "yambs3").unlink()
+        audit()
+        assert len(calls) == 2
+        audit()
+        assert len(calls) == 2
+
+
+def test_dependency_manager_fingerprint_includes():
+    """Test that changes to included configuration files are detected."""
+
+    calls: List[str] = []
+
+    def handler(task: DependencyTask) -> DependencyState:
+        """Keep track of handler calls."""
+
+        calls.append(str(task.dep))
+        return yambs_handler(task)
+
+    with TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+
+        directory = tmp_path.joinpath("project", "native3")
+        copytree(clean_scenario("native3"), directory)
+        config = directory.joinpath("yambs.yaml")
+        config.write_text(
+            config.read_text(encoding="utf-8").replace(
+                "includes:\n", "includes:\n  - extra.yaml\n"
+            ),
+            encoding="utf-8",
+        )
+        extra = directory.joinpath("extra.yaml")
+        extra.write_text("---\n{}\n", encoding="utf-8")
+
+        dep = make_dep(str(directory))
+        output = tmp_path.joinpath("output")
+        output.mkdir()
+
+        def audit() -> DependencyManager:
+            """Audit the dependency with a new manager."""
+
+            manager = DependencyManager(output, directory.parent)
+            with patch.dict(
+                "yambs.dependency.manager.HANDLERS",
+                {DependencyKind.YAMBS: handler},
+            ):
+                manager.audit(dep)
+            manager.save(output.joinpath("third_party.ninja"))
+            return manager
+
+        files = audit().handler_data(dep)["config_files"]
+        assert str(extra) in files
+
+        # Checking the fingerprint doesn't load the configuration.
+        with patch.object(ARBITER, "decode", wraps=ARBITER.decode) as decode:
+            audit()
+        assert all(call.args[0] != config for call in decode.call_args_list)
+        assert len(calls) == 1
+
+        extra.write_text("---\nvariants: {}\n", encoding="utf-8")
+        audit()
+        assert len(calls) == 2
@@ -0,0 +1,130 @@
+"""
+Test the 'generate.ninja.writer' module.
+"""
+
+# built-in
+from io import StringIO
+from os import linesep
+from pathlib import Path
+from time import perf_counter_ns
+from typing import List, TextIO
+
+# internal
+from yambs.generate.ninja import variant_phony, write_link
+
+# module under test
+from yambs.generate.ninja.writer import NinjaWriter
+
+
+def write_continuation(stream: TextIO, offset: str) -> None:
+    """The original line-continuation implementation."""
+    stream.write(" $" + linesep + offset)
+
+
+def write_link_original(
+    stream: TextIO,
+    output: Path,
+    entry_object: Path,
+    outputs: List[Path],
+    wasm: bool = False,
+) -> None:
+    """The original (per-input 'stream.write') link-rule implementation."""
+
+    pairs = [(output.suffix, entry_object.suffix, "link")]
+
+    if wasm:
+        pairs.append((".html", ".wasm", "link_no_map"))
+
+    for out_suffix, entry_suffx, rule in pairs:
+        line = f"build {output.with_suffix(out_suffix)}: {rule} "
+        offset = " " * len(line)
+
+        stream.write(line + str(entry_object.with_suffix(entry_suffx)))
+
+        for file in outputs:
+            write_continuation(stream, offset)
+            stream.write(str(file.with_suffix(entry_suffx)))
+
+        stream.write(" | ${variant}_third_party" + linesep + linesep)
+
+
+def variant_phony_original(
+    stream: TextIO, elfs_list: List[Path], suffixes: List[str]
+) -> None:
+    """The original variant phony-target implementation."""
+
+    line = "build ${variant}_apps: phony "
+    offset = " " * len(line)
+
+    stream.write(line + str(elfs_list[0]))
+    for elf in elfs_list[1:]:
+        write_continuation(stream, offset)
+        stream.write(str(elf))
+    stream.write(linesep)
+
+    for suffix in suffixes:
+        line = "build ${variant}_" + f"{suffix}s: phony "
+        offset = " " * len(line)
+
+        outputs = [x.with_suffix("." + suffix) for x in elfs_list]
+
+        stream.write(line + str(outputs[0]))
+        for elf in outputs[1:]:
+            write_continuation(stream, offset)
+            stream.write(str(elf))
+        stream.write(linesep)
+
+
+def test_ninja_writer_basic():
+    """Test basic writer interactions."""
+
+    writer = NinjaWriter()
+    writer.line("rule cc")
+    writer.build("a", "phony", ["b", "c"], suffix="")
+    assert writer.getvalue() == (
+        "rule cc" + linesep + "build a: phony b $" + linesep + " " * 15 + "c"
+    )
+
+    # Converted paths are cached.
+    path = Path("a", "b.c")
+    assert writer.path(path, ".o") == str(Path("a", "b.o"))
+    assert writer.path(path, ".o") is writer.path(path, ".o")
+    assert writer.path(path) == str(path)
+
+
+def test_ninja_writer_matches_original():
+    """
+    Test that link and phony rules are byte-identical to the original
+    implementation (and compare performance).
+    """
+
+    outputs = [
+        Path("$build_dir", f"dir{idx % 100}", f"source{idx}.o")
+        for idx in range(20000)
+    ]
+    apps = [Path("$build_dir", "apps", f"app{idx}.elf") for idx in range(8)]
+
+    start = perf_counter_ns()
+    with StringIO() as stream:
+        for app in apps:
+            write_link_original(
+                stream, app, app.with_suffix(".o"), outputs, wasm=True
+            )
+        variant_phony_original(stream, apps, ["html", "uf2"])
+        expected = stream.getvalue()
+    original_ns = perf_counter_ns() - start
+
+    start = perf_counter_ns()
+    writer = NinjaWriter()
+    for app in apps:
+        write_link(writer, app, app.with_suffix(".o"), outputs, wasm=True)
+    variant_phony(writer, apps, uf2_family="rp2040", wasm=True)
+    result = writer.getvalue()
+    writer_ns = perf_counter_ns() - start
+
+    assert result == expected
+
+    print(
+        f"original: {original_ns / 1e6:.1f} ms, "
+        f"writer: {writer_ns / 1e6:.1f} ms"
+    )
@@ -0,0 +1,38 @@
+"""
+Test the 'generate.common' module.
+"""
+
+# built-in
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# module under test
+from yambs.generate.common import bytecode_cache, get_jinja
+
+
+def test_get_jinja_bytecode_cache():
+    """Test that compiled templates are cached on disk."""
+
+    with TemporaryDirectory() as tmp:
+        with patch.dict("os.environ", {"XDG_CACHE_HOME": tmp}):
+            get_jinja.cache_clear()
+            jinja = get_jinja()
+            assert get_jinja() is jinja
+
+            jinja.get_template("native_rules.ninja.j2")
+            assert list(Path(tmp, "yambs", "jinja").rglob("*.cache"))
+
+            # Templates should load from the cache in a new environment.
+            get_jinja.cache_clear()
+            with patch("jinja2.environment.Environment._compile") as comp:
+                assert get_jinja().get_template("native_rules.ninja.j2")
+                comp.assert_not_called()
+
+        get_jinja.cache_clear()
+
+        # The cache isn't used if its directory can't be created.
+        path = Path(tmp, "file")
+        path.touch()
+        with patch.dict("os.environ", {"XDG_CACHE_HOME": str(path)}):
+            assert bytecode_cache() is None
@@ -0,0 +1,115 @@
+"""
+Test the 'github.session' module.
+"""
+
+# built-in
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+import json
+from typing import Dict, Iterator, List
+from unittest.mock import patch
+
+# third-party
+from pytest import raises
+
+# internal
+from tests.resources import http_server
+
+# module under test
+from yambs.github import release_data
+from yambs.github.session import get_json
+
+RELEASE = {"name": "a", "html_url": "b", "assets": []}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """A stand-in for the GitHub API."""
+
+    requests: List[Dict[str, str]] = []
+    failures: Dict[str, int] = {}
+
+    def log_message(self, *_) -> None:  # pylint: disable=arguments-differ
+        """Don't log requests."""
+
+    def respond(self, status: int, data: object = None) -> None:
+        """Send a response."""
+
+        body = json.dumps(data).encode() if data is not None else b""
+
+        self.send_response(status)
+        if status == 200:
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a request."""
+
+        type(self).requests.append({"path": self.path, **self.headers})
+
+        # Fail a configured number of times.
+        if self.failures.get(self.path, 0):
+            self.failures[self.path] -= 1
+            self.respond(503, {})
+
+        elif self.path == "/invalid":
+            self.respond(200, {"message": "rate limited"})
+
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.respond(304)
+
+        else:
+            self.respond(200, RELEASE)
+
+
+@contextmanager
+def server() -> Iterator[str]:
+    """Run a local stand-in for the GitHub API."""
+
+    Handler.requests = []
+    Handler.failures = {}
+
+    with http_server(Handler) as url:
+        yield url
+
+
+def test_get_json_conditional():
+    """Test that repeated requests are conditional."""
+
+    with server() as url:
+        assert get_json(f"{url}/release", timeout=5) == RELEASE
+        assert "If-None-Match" not in Handler.requests[-1]
+
+        assert get_json(f"{url}/release", timeout=5) == RELEASE
+        assert Handler.requests[-1]["If-None-Match"] == '"v1"'
+
+        # Caching can be disabled.
+        assert get_json(f"{url}/release", timeout=5, cache=False) == RELEASE
+        assert "If-None-Match" not in Handler.requests[-1]
+
+        # Transient errors are retried.
+        Handler.failures["/retry"] = 1
+        assert get_json(f"{url}/retry", timeout=5) == RELEASE
+        assert len(Handler.requests) == 5
+
+
+def test_release_data_retries():
+    """Test that invalid release data is requested again."""
+
+    with server() as url:
+        with patch(
+            "yambs.github.repo_release_api_url",
+            return_value=f"{url}/release",
+        ):
+            assert release_data("a", "b", timeout=5) == RELEASE
+            assert release_data("a", "b", timeout=5) == RELEASE
+            assert len(Handler.requests) == 2
+
+        with patch(
+            "yambs.github.repo_release_api_url",
+            return_value=f"{url}/invalid",
+        ):
+            with raises(AssertionError, match="rate limited"):
+                release_data("a", "b", timeout=5, tries=3, backoff=0.0)
+            assert len(Handler.requests) == 5
@@ -3,8 +3,14 @@ A module for working with test data.
 """
 
 # built-in
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from shutil import rmtree
+from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import Iterator
+from unittest.mock import patch
 
 
 def resource(resource_name: str, *parts: str, valid: bool = True) -> Path:
@@ -32,3 +38,23 @@ def clean_scenario(name: str) -> Path:
 
 OWNER = "vkottler"
 REPO = "yambs-sample"
+
+
+@contextmanager
+def http_server(handler: type[BaseHTTPRequestHandler]) -> Iterator[str]:
+    """
+    Run a local HTTP server (with a temporary cache directory) and provide
+    its URL.
+    """
+
+    with TemporaryDirectory() as tmp:
+        with patch.dict("os.environ", {"XDG_CACHE_HOME": str(Path(tmp))}):
+            httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+            thread = Thread(target=httpd.serve_forever, daemon=True)
+            thread.start()
+            try:
+                yield f"http://127.0.0.1:{httpd.server_address[1]}"
+            finally:
+                httpd.shutdown()
+                httpd.server_close()
+                thread.join()
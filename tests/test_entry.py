@@ -26,3 +26,46 @@ def test_package_entry():
     """Test the command-line entry through the 'python -m' invocation."""
 
     check_output([executable, "-m", "yambs", "-h"])
+
+    # Commands' arguments are only added when the command is parsed.
+    assert "--compiled-config" in check_output(
+        [executable, "-m", "yambs", "native", "-h"], text=True
+    )
+
+
+def test_entry_lazy_imports():
+    """
+    Test that running a command doesn't import every command's dependencies
+    (and report how long the entry-point takes to import).
+    """
+
+    output = check_output(
+        [
+            executable,
+            "-c",
+            ";".join(
+                [
+                    "import sys, time",
+                    "start = time.perf_counter_ns()",
+                    "from yambs.entry import main",
+                    "elapsed = time.perf_counter_ns() - start",
+                    f"assert main(['{PKG_NAME}', 'noop']) == 0",
+                    "print(elapsed)",
+                    "print(' '.join(sorted(sys.modules)))",
+                ]
+            ),
+        ],
+        text=True,
+    ).splitlines()
+
+    modules = set(output[1].split())
+    for module in [
+        "requests",
+        "jinja2",
+        "rcmpy.watch",
+        "yambs.schemas",
+        "yambs.commands.native",
+    ]:
+        assert module not in modules, module
+
+    print(f"Entry-point import: {int(output[0]) / 1e6:.1f} ms.")
@@ -0,0 +1,143 @@
+"""
+Test the 'paths' module.
+"""
+
+# built-in
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from random import shuffle
+import stat
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns
+from unittest.mock import patch
+
+# third-party
+from pytest import raises
+
+# module under test
+from yambs.paths import (
+    depfile_path,
+    encode_if_changed,
+    loaded_files,
+    read_depfile,
+    sorted_paths,
+    user_cache_dir,
+    write_depfile,
+    write_if_changed,
+)
+
+
+def test_write_if_changed():
+    """Test that files are only written when their contents change."""
+
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp, "test.txt")
+
+        assert write_if_changed(path, "hello")
+        assert not write_if_changed(path, "hello")
+        assert not write_if_changed(path, b"hello")
+        assert write_if_changed(path, "hello!")
+        assert write_if_changed(path, "world!")
+        assert path.read_text(encoding="utf-8") == "world!"
+
+        # No temporary files should be left behind.
+        assert list(Path(tmp).iterdir()) == [path]
+
+        # Permissions are kept.
+        path.chmod(0o750)
+        assert write_if_changed(path, "hello")
+        assert stat.S_IMODE(path.stat().st_mode) == 0o750
+
+        # Threads can write the same file concurrently.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [
+                executor.submit(
+                    write_if_changed, path, chr(97 + idx) * 100_000
+                )
+                for idx in range(26)
+            ]:
+                future.result()
+        assert list(Path(tmp).iterdir()) == [path]
+        assert len(set(path.read_text(encoding="utf-8"))) == 1
+
+        # Temporary files are removed if the file can't be replaced.
+        with patch("yambs.paths.replace", side_effect=OSError):
+            with raises(OSError):
+                write_if_changed(path, "hello")
+        assert list(Path(tmp).iterdir()) == [path]
+
+        path = Path(tmp, "test.json")
+        assert encode_if_changed(path, {"a": 1})
+        assert not encode_if_changed(path, {"a": 1})
+        assert encode_if_changed(path, {"a": 2})
+
+
+def test_sorted_paths_benchmark():
+    """Test path sorting (and compare it to sorting path objects directly)."""
+
+    paths = [
+        Path("src", f"dir{idx % 300}", f"sub{idx % 7}", f"source{idx}.cc")
+        for idx in range(50000)
+    ]
+    shuffle(paths)
+
+    start = perf_counter_ns()
+    expected = sorted(paths)
+    original_ns = perf_counter_ns() - start
+
+    start = perf_counter_ns()
+    result = sorted_paths(paths)
+    sorted_ns = perf_counter_ns() - start
+
+    assert set(result) == set(expected)
+    assert result == sorted_paths(reversed(paths))
+
+    print(
+        f"Path: {original_ns / 1e6:.1f} ms, "
+        f"sorted_paths: {sorted_ns / 1e6:.1f} ms"
+    )
+
+
+def test_user_cache_dir():
+    """Test the per-user cache directory."""
+
+    with patch.dict("os.environ", {"XDG_CACHE_HOME": "cache"}):
+        assert user_cache_dir("a") == Path("cache", "yambs", "a")
+
+    with patch.dict("os.environ", {"XDG_CACHE_HOME": ""}):
+        assert user_cache_dir() == Path.home().joinpath(".cache", "yambs")
+
+
+def test_depfile_round_trip():
+    """Test writing and reading dependency files."""
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        output = root.joinpath("out $dir", "output.json")
+        inputs = [
+            root.joinpath("a b.yaml"),
+            root.joinpath("c$.yaml"),
+            Path("d"),
+        ]
+
+        assert read_depfile(output) is None
+
+        output.parent.mkdir()
+        assert write_depfile(output, inputs)
+        assert not write_depfile(output, inputs)
+        assert depfile_path(output).name == "output.json.d"
+
+        assert read_depfile(output) == inputs
+
+
+def test_loaded_files():
+    """Test collecting the files that data was decoded from."""
+
+    root = Path.cwd()
+    config = Path("yambs.yaml")
+    include = root.joinpath("include.yaml")
+
+    assert loaded_files(
+        [config],
+        [config, include, Path("include.yaml"), root.joinpath("yambs.yaml")],
+    ) == [config, include]
@@ -0,0 +1,69 @@
+"""
+Test the 'schemas' module.
+"""
+
+# built-in
+import marshal
+from pathlib import Path
+from sys import implementation
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# third-party
+from pytest import raises
+from vcorelib.schemas.base import SchemaValidationError
+
+# module under test
+from yambs import PKG_NAME
+from yambs.schemas import PackageSchemaMap
+
+
+def test_package_schema_map_lazy():
+    """Test that schemas are only loaded when requested."""
+
+    schemas = PackageSchemaMap(PKG_NAME)
+    assert "Github" in schemas
+    assert "Unknown" not in schemas
+    assert not schemas.data
+
+    assert schemas["Github"]({"owner": "a"}) == {"owner": "a"}
+    assert list(schemas.data) == ["Github"]
+
+    with raises(SchemaValidationError):
+        schemas["Github"]({"unknown": "a"})
+
+    with raises(KeyError):
+        assert schemas["Unknown"]
+
+
+def test_package_schema_map_cache():
+    """Test persisting compiled schemas."""
+
+    with TemporaryDirectory() as tmp:
+        schemas = PackageSchemaMap(PKG_NAME, cache=Path(tmp))
+        expected = schemas["Native"]({})
+        assert list(Path(tmp).rglob("Native-*.marshal"))
+
+        # Cached schemas shouldn't need to be loaded from source again.
+        with patch("yambs.schemas.ARBITER.decode") as decode:
+            schemas = PackageSchemaMap(PKG_NAME, cache=Path(tmp))
+            assert schemas["Native"]({}) == expected
+            decode.assert_not_called()
+
+        # Corrupt (or incompatible) entries are replaced.
+        for contents in [b"", b"\x00", marshal.dumps(({}, "code"))]:
+            cached = schemas.cache_path("Native")
+            assert cached is not None
+            assert implementation.cache_tag in cached.name
+            cached.write_bytes(contents)
+
+            schemas = PackageSchemaMap(PKG_NAME, cache=Path(tmp))
+            assert schemas["Native"]({}) == expected
+            assert cached.read_bytes() != contents
+
+        # The cache isn't used if its directory can't be created.
+        path = Path(tmp, "file")
+        path.touch()
+        schemas = PackageSchemaMap(PKG_NAME, cache=path)
+        assert schemas.cache_path("Native") is None
+        assert schemas["Native"]({}) == expected
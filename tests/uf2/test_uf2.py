@@ -2,10 +2,21 @@
 Test the 'uf2' module.
 """
 
+# built-in
+from io import BytesIO
+from pathlib import Path
+from random import Random
+import struct
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns
+from typing import Dict, List
+from unittest.mock import patch
+
 # internal
 from tests.resources import resource
 
 # module under test
+from yambs import uf2
 from yambs.uf2 import board_id, to_str
 
 
@@ -15,3 +26,282 @@ def test_board_id():
     assert board_id(str(resource("."))) is not None
     assert board_id(str(resource(".")), info_file="/test.txt") is None
     assert to_str(b"hello") == "hello"
+
+
+def convert_to_uf2_original(
+    file_content: bytes, start_addr: int, family_id: int
+) -> bytes:
+    """The original (per-block 'struct.pack') UF2 encoder."""
+
+    datapadding = b""
+    while len(datapadding) < 512 - 256 - 32 - 4:
+        datapadding += b"\x00\x00\x00\x00"
+    numblocks = (len(file_content) + 255) // 256
+    outp = []
+    for blockno in range(numblocks):
+        ptr = 256 * blockno
+        chunk = file_content[ptr : ptr + 256]
+        flags = 0x0
+        if family_id:
+            flags |= 0x2000
+
+        header = struct.pack(
+            b"<IIIIIIII",
+            uf2.UF2_MAGIC_START0,
+            uf2.UF2_MAGIC_START1,
+            flags,
+            ptr + start_addr,
+            256,
+            blockno,
+            numblocks,
+            family_id,
+        )
+        while len(chunk) < 256:
+            chunk += b"\x00"
+        block = (
+            header
+            + chunk
+            + datapadding
+            + struct.pack(b"<I", uf2.UF2_MAGIC_END)
+        )
+        outp.append(block)
+    return b"".join(outp)
+
+
+def test_convert_to_uf2_benchmark():
+    """
+    Test that the bulk UF2 encoder matches the original implementation (and
+    report how long each takes to convert a 16 MiB image).
+    """
+
+    # Also exercise a final, partial block.
+    image = Random(0).randbytes(16 * 1024 * 1024 + 100)
+
+    for family in [0x0, 0xE48BFF56]:
+        start = perf_counter_ns()
+        expected = convert_to_uf2_original(image, 0x10000000, family)
+        original_ns = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        result = uf2.encode_uf2(image, 0x10000000, family)
+        bulk_ns = perf_counter_ns() - start
+
+        assert result == expected
+
+    # The module-state interface uses the same encoder.
+    with (
+        patch.object(uf2, "APPSTARTADDR", 0x10000000),
+        patch.object(uf2, "FAMILYID", family),
+    ):
+        assert uf2.convert_to_uf2(image) == expected
+
+    print(
+        f"UF2 encode (16 MiB): original {original_ns / 1e6:.1f} ms, "
+        f"bulk {bulk_ns / 1e6:.1f} ms."
+    )
+
+
+def convert_from_hex_to_uf2_original(buf: str) -> bytes:
+    """The original (per-byte) Intel HEX to UF2 converter."""
+
+    upper = 0
+    currblock = None
+    blocks = []
+    for line in buf.split("\n"):
+        if not line or line[0] != ":":
+            continue
+
+        i = 1
+        rec = []
+        while i < len(line) - 1:
+            rec.append(int(line[i : i + 2], 16))
+            i += 2
+
+        tp_val = rec[3]
+        if tp_val == 4:
+            upper = ((rec[4] << 8) | rec[5]) << 16
+        elif tp_val == 1:
+            break
+        elif tp_val == 0:
+            addr = upper + ((rec[1] << 8) | rec[2])
+            i = 4
+            while i < len(rec) - 1:
+                if not currblock or currblock.addr & ~0xFF != addr & ~0xFF:
+                    currblock = uf2.Block(addr & ~0xFF)
+                    blocks.append(currblock)
+                currblock.bytes[addr & 0xFF] = rec[i]
+                addr += 1
+                i += 1
+
+    numblocks = len(blocks)
+    resfile = b""
+    for i in range(0, numblocks):
+        resfile += blocks[i].encode(i, numblocks, uf2.FAMILYID)
+    return resfile
+
+
+def hex_record(tp_val: int, addr: int, data: bytes) -> str:
+    """Create an Intel HEX record."""
+
+    rec = bytes([len(data), addr >> 8, addr & 0xFF, tp_val]) + data
+    return f":{(rec + bytes([-sum(rec) & 0xFF])).hex().upper()}"
+
+
+def hex_image(image: bytes, start: int, size: int = 16) -> List[str]:
+    """Create Intel HEX records for an image."""
+
+    lines = []
+    upper = None
+    for ptr in range(0, len(image), size):
+        addr = start + ptr
+        if addr >> 16 != upper:
+            upper = addr >> 16
+            lines.append(hex_record(4, 0, upper.to_bytes(2, "big")))
+        lines.append(hex_record(0, addr & 0xFFFF, image[ptr : ptr + size]))
+
+    return lines
+
+
+def uf2_payloads(buf: bytes) -> Dict[int, bytes]:
+    """Get the payload of each UF2 block (by address)."""
+
+    return {
+        struct.unpack_from("<I", buf, ptr + 12)[0]: buf[ptr + 32 : ptr + 288]
+        for ptr in range(0, len(buf), 512)
+    }
+
+
+def test_convert_from_hex_to_uf2_benchmark():
+    """
+    Test that the HEX converter matches the original implementation (and
+    report how long each takes to convert a 1 MiB image).
+    """
+
+    # Records that aren't block aligned span two blocks.
+    image = Random(0).randbytes(1024 * 1024 + 100)
+    buf = "\r\n".join(hex_image(image, 0x1000FFF8) + [":00000001FF", ""])
+
+    with patch.object(uf2, "FAMILYID", 0xE48BFF56):
+        start = perf_counter_ns()
+        expected = convert_from_hex_to_uf2_original(buf)
+        original_ns = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        result = uf2.convert_from_hex_to_uf2(buf)
+        fast_ns = perf_counter_ns() - start
+
+    assert result == expected
+    assert uf2.APPSTARTADDR == 0x1000FFF8
+
+    print(
+        f"HEX to UF2 (1 MiB): original {original_ns / 1e6:.1f} ms, "
+        f"fast {fast_ns / 1e6:.1f} ms."
+    )
+
+    text = resource("test1.hex").read_text(encoding="utf-8")
+    assert uf2.convert_from_hex_to_uf2(
+        text
+    ) == convert_from_hex_to_uf2_original(text)
+
+
+def test_convert_from_hex_to_uf2_out_of_order():
+    """Test converting HEX records that aren't in address order."""
+
+    image = Random(1).randbytes(4096)
+    lines = hex_image(image, 0x2000, size=32)
+
+    shuffled = lines[1:]
+    Random(2).shuffle(shuffled)
+    result, _ = uf2.encode_hex("\n".join(lines[:1] + shuffled))
+
+    assert len(result) == 16 * 512
+    assert uf2_payloads(result) == {
+        0x2000 + ptr: image[ptr : ptr + 256] for ptr in range(0, 4096, 256)
+    }
+
+    # Blocks are emitted in address order (so the output can be decoded).
+    with BytesIO() as stream:
+        assert uf2.decode_uf2(result, stream) == (len(image), 0x2000)
+        assert stream.getvalue() == image
+
+
+def test_decode_uf2_file():
+    """Test decoding memory-mapped UF2 files directly to an output file."""
+
+    assert uf2.load_families() is uf2.load_families()
+
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+
+        # A UF2 file with multiple families.
+        source = resource("pi_pico_circuitpython.uf2")
+        output = root.joinpath("out.bin")
+        data = source.read_bytes()
+
+        result = uf2.decode_uf2_file(str(source), str(output))
+        assert output.read_bytes() == uf2.convert_from_uf2(data)
+        assert result.size == output.stat().st_size
+
+        # Only gather information.
+        assert uf2.decode_uf2_file(str(source)) == result
+
+        # Round trip an image.
+        image = Random(0).randbytes(4 * 1024 * 1024 + 100)
+        source = root.joinpath("image.uf2")
+        source.write_bytes(uf2.encode_uf2(image, 0x10000000, 0xE48BFF56))
+
+        result = uf2.decode_uf2_file(str(source), str(output), 0xE48BFF56)
+
+        assert result.start_addr == 0x10000000
+        padded = image + bytes(-len(image) % uf2.UF2_PAYLOAD_SIZE)
+        assert result.size == len(padded)
+        assert output.read_bytes() == padded
+
+
+def test_convert_files():
+    """Test converting many files concurrently (without module state)."""
+
+    rand = Random(3)
+
+    with TemporaryDirectory() as tmp, patch.object(uf2, "APPSTARTADDR", 0x0):
+        root = Path(tmp)
+
+        paths = []
+        expected = []
+        for idx in range(8):
+            image = rand.randbytes(rand.randrange(1, 64 * 1024))
+
+            # Binary files are all written at the same address.
+            start = 0x10000000 + (idx % 2) * idx * 0x1000
+
+            src = root.joinpath(f"{idx}.bin")
+            if idx % 2:
+                src = src.with_suffix(".hex")
+                src.write_text(
+                    "\n".join(hex_image(image, start) + [":00000001FF"]),
+                    encoding="utf-8",
+                )
+            else:
+                src.write_bytes(image)
+
+            paths.append((str(src), str(src.with_suffix(".uf2"))))
+            expected.append((uf2.encode_uf2(image, start, 0xE48BFF56), start))
+
+        results = uf2.convert_files(
+            paths, start_addr=0x10000000, family_id=0xE48BFF56
+        )
+        for idx, (result, (data, start)) in enumerate(zip(results, expected)):
+            assert result == (len(data), start)
+            assert Path(paths[idx][1]).read_bytes() == data
+
+            # Decode the output again.
+            output = root.joinpath(f"{idx}.out")
+            decoded = uf2.decode_uf2_file(
+                paths[idx][1], str(output), 0xE48BFF56
+            )
+            assert decoded.start_addr == start
+            assert decoded.size == output.stat().st_size
+
+        # Module state isn't used (or modified).
+        assert uf2.APPSTARTADDR == 0x0
+        assert uf2.FAMILYID == 0x0
@@ -4,30 +4,108 @@ A module with interfaces for aggregating sources.
 
 # built-in
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Set
+from typing import Collection, Dict, Iterable, List, Set, Tuple
 
 # internal
+from yambs.aggregation.snapshot import SourceSnapshot, list_directory
 from yambs.generate.common import APP_ROOT
 
 BySuffixPaths = Dict[str, Set[Path]]
 
+# A starting directory and whether or not to recurse into it.
+SourceRoot = Tuple[Path, bool]
+
 
 def collect_files(
-    root: Path, recurse: bool = True, files: BySuffixPaths = None
+    root: Path,
+    recurse: bool = True,
+    files: BySuffixPaths = None,
+    snapshot: SourceSnapshot = None,
+    prune: Collection[str] = (),
 ) -> BySuffixPaths:
-    """Collect files (by suffix) from a starting directory."""
+    """
+    Collect files (by suffix) from a starting directory. Directories with
+    names in 'prune' aren't recursed into.
+    """
 
     if files is None:
         files = defaultdict(set)
 
-    for item in root.iterdir():
-        if item.is_dir() and recurse:
-            for suffix, found in collect_files(item, recurse=recurse).items():
-                files[suffix].update(found)
-        else:
+    to_visit: List[Path] = [root]
+    while to_visit:
+        directory = to_visit.pop()
+
+        listing = (
+            list_directory(directory)
+            if snapshot is None
+            else snapshot.listing(directory)
+        )
+
+        # Creating entries from an already-parsed sibling path is much
+        # cheaper than joining (and later re-parsing) the full path.
+        sibling = directory.joinpath("_")
+
+        for name in listing.files:
+            item = sibling.with_name(name)
             files[item.suffix].add(item)
 
+        for name in listing.dirs:
+            item = sibling.with_name(name)
+            if not recurse:
+                files[item.suffix].add(item)
+            elif name not in prune:
+                to_visit.append(item)
+
+    return files
+
+
+def collect_roots(
+    roots: Iterable[SourceRoot],
+    files: BySuffixPaths = None,
+    snapshot: SourceSnapshot = None,
+    prune: Collection[str] = (),
+    jobs: int = 1,
+) -> BySuffixPaths:
+    """
+    Collect files (by suffix) from multiple starting directories. Roots are
+    scanned concurrently (by a pool of 'jobs' threads) when possible and their
+    results are merged in the order that roots were provided.
+    """
+
+    if files is None:
+        files = defaultdict(set)
+
+    roots = list(roots)
+
+    if jobs > 1 and len(roots) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(
+                    lambda root: collect_files(
+                        root[0],
+                        recurse=root[1],
+                        snapshot=snapshot,
+                        prune=prune,
+                    ),
+                    roots,
+                )
+            )
+
+        for result in results:
+            for suffix, found in result.items():
+                files[suffix].update(found)
+    else:
+        for root, recurse in roots:
+            collect_files(
+                root,
+                recurse=recurse,
+                files=files,
+                snapshot=snapshot,
+                prune=prune,
+            )
+
     return files
 
 
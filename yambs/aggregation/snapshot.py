@@ -0,0 +1,121 @@
+"""
+A module for persisting source-tree directory listings between runs.
+"""
+
+# built-in
+from os import scandir
+from pathlib import Path
+from threading import Lock
+from time import time_ns
+from typing import Any, Dict, List, NamedTuple
+
+# third-party
+from vcorelib.io import ARBITER
+from vcorelib.logging import LoggerType
+
+# internal
+from yambs.paths import RACY_WINDOW_NS, encode_if_changed
+
+SNAPSHOT_VERSION = 1
+
+
+class DirectoryListing(NamedTuple):
+    """Names of the entries found in a single directory."""
+
+    files: List[str]
+    dirs: List[str]
+
+
+def list_directory(root: Path) -> DirectoryListing:
+    """Read a directory's entries from the file system."""
+
+    result = DirectoryListing([], [])
+
+    # Directory-entry type information is (usually) available without
+    # additional 'stat' calls.
+    with scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                result.dirs.append(entry.name)
+            else:
+                result.files.append(entry.name)
+
+    # Keep listings (and persisted snapshots) independent of file-system
+    # ordering.
+    result.files.sort()
+    result.dirs.sort()
+
+    return result
+
+
+class SourceSnapshot:
+    """
+    A class for re-using directory listings (keyed by directory
+    modification time) from a previous run.
+    """
+
+    def __init__(self, path: Path, racy_ns: int = RACY_WINDOW_NS) -> None:
+        """Initialize this instance."""
+
+        self.path = path
+
+        # There's no previous snapshot on the first (or a clean) run.
+        self.previous: Dict[str, Any] = {}
+        if path.is_file():
+            data = ARBITER.decode(path).data
+            if data.get("version") == SNAPSHOT_VERSION:
+                self.previous = data.get("directories", {})  # type: ignore
+
+        self.current: Dict[str, Any] = {}
+        self.lock = Lock()
+        self.trusted_before = time_ns() - racy_ns
+
+        self.hits = 0
+        self.misses = 0
+
+    def listing(self, root: Path) -> DirectoryListing:
+        """Get a directory listing (from the previous run if possible)."""
+
+        key = str(root)
+        mtime = root.stat().st_mtime_ns
+
+        hit = False
+        prev = self.previous.get(key)
+        if prev is not None and prev["mtime"] == mtime:
+            result = DirectoryListing(prev["files"], prev["dirs"])
+            hit = True
+        else:
+            result = list_directory(root)
+
+        # Listings may be requested from multiple threads.
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+            self.current[key] = {
+                "mtime": mtime if mtime < self.trusted_before else None,
+                "files": result.files,
+                "dirs": result.dirs,
+            }
+
+        return result
+
+    def save(self, logger: LoggerType = None) -> None:
+        """Persist directory listings from this run."""
+
+        encode_if_changed(
+            self.path,
+            {
+                "version": SNAPSHOT_VERSION,
+                "directories": dict(sorted(self.current.items())),
+            },
+        )
+
+        if logger is not None:
+            logger.info(
+                "Source snapshot: %d directories re-used, %d listed.",
+                self.hits,
+                self.misses,
+            )
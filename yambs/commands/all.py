@@ -9,54 +9,97 @@ A module aggregating package commands.
 """
 
 # built-in
+from argparse import ArgumentParser as _ArgumentParser
+from argparse import Namespace as _Namespace
+from importlib import import_module as _import_module
+from typing import Any as _Any
 from typing import List as _List
+from typing import Optional as _Optional
 from typing import Tuple as _Tuple
 
 # third-party
+from vcorelib.args import CommandFunction as _CommandFunction
 from vcorelib.args import CommandRegister as _CommandRegister
 
-# internal
-from yambs.commands.compile_config import add_compile_config_cmd
-from yambs.commands.dist import add_dist_cmd
-from yambs.commands.download import add_download_cmd
-from yambs.commands.gen import add_gen_cmd
-from yambs.commands.native import add_native_cmd
-from yambs.commands.uf2conv import add_uf2conv_cmd
+
+def lazy_command(name: str) -> _CommandRegister:
+    """
+    Create a register for a command that only imports the command's module
+    (and adds its arguments) if the command is actually parsed.
+    """
+
+    def register(parser: _ArgumentParser) -> _CommandFunction:
+        """Defer adding arguments until the parser is used."""
+
+        command: _Optional[_CommandFunction] = None
+        parse = parser.parse_known_args
+
+        def load() -> _CommandFunction:
+            """Import the command's module and add its arguments."""
+
+            nonlocal command
+            if command is None:
+                command = getattr(
+                    _import_module(f"yambs.commands.{name}"),
+                    f"add_{name}_cmd",
+                )(parser)
+            assert command is not None
+            return command
+
+        def parse_known_args(*args: _Any, **kwargs: _Any) -> _Any:
+            """Add the command's arguments before parsing."""
+            load()
+            return parse(*args, **kwargs)
+
+        setattr(parser, "parse_known_args", parse_known_args)
+
+        def run(args: _Namespace) -> int:
+            """Run the command."""
+            return load()(args)
+
+        return run
+
+    return register
 
 
 def commands() -> _List[_Tuple[str, str, _CommandRegister]]:
     """Get this package's commands."""
 
     return [
+        (
+            "cache",
+            "manage the shared dependency-artifact cache",
+            lazy_command("cache"),
+        ),
         (
             "compile_config",
             "load configuration data and write results to a file",
-            add_compile_config_cmd,
+            lazy_command("compile_config"),
         ),
         (
             "dist",
             "create a source distribution",
-            add_dist_cmd,
+            lazy_command("dist"),
         ),
         (
             "download",
             "download GitHub release assets",
-            add_download_cmd,
+            lazy_command("download"),
         ),
         (
             "gen",
             "poll the source tree and generate any new build files",
-            add_gen_cmd,
+            lazy_command("gen"),
         ),
         (
             "native",
             "generate build files for native-only target projects",
-            add_native_cmd,
+            lazy_command("native"),
         ),
         (
             "uf2conv",
             "convert to UF2 or flash directly",
-            add_uf2conv_cmd,
+            lazy_command("uf2conv"),
         ),
         ("noop", "command stub (does nothing)", lambda _: lambda _: 0),
     ]
@@ -0,0 +1,56 @@
+"""
+An entry-point for the 'cache' command.
+"""
+
+# built-in
+from argparse import ArgumentParser as _ArgumentParser
+from argparse import Namespace as _Namespace
+
+# third-party
+from vcorelib.args import CommandFunction as _CommandFunction
+
+# internal
+from yambs.commands.common import LOG
+from yambs.dependency.cache import ArtifactCache
+
+MIB = 1024 * 1024
+
+
+def cache_cmd(args: _Namespace) -> int:
+    """Execute the cache command."""
+
+    cache = ArtifactCache()
+
+    for entry in cache.evict(int(args.max_size * MIB)):
+        LOG.info("Evicted '%s' (%.1f MiB).", entry.path, entry.size / MIB)
+
+    entries = cache.entries()
+    for entry in entries:
+        LOG.info("'%s' (%.1f MiB).", entry.path, entry.size / MIB)
+
+    LOG.info(
+        "%d entries (%.1f MiB) in '%s'.",
+        len(entries),
+        sum(x.size for x in entries) / MIB,
+        cache.root,
+    )
+
+    return 0
+
+
+def add_cache_cmd(parser: _ArgumentParser) -> _CommandFunction:
+    """Add cache-command arguments to its parser."""
+
+    parser.add_argument(
+        "-s",
+        "--max-size",
+        type=float,
+        default=2048.0,
+        help=(
+            "maximum size of the shared dependency cache in MiB, "
+            "least-recently used entries are evicted until the cache "
+            "fits (default: %(default)s)"
+        ),
+    )
+
+    return cache_cmd
@@ -17,7 +17,7 @@ from rcmpy.watch.params import WatchParams
 
 # internal
 from yambs import DESCRIPTION, PKG_NAME, VERSION
-from yambs.config.common import DEFAULT_CONFIG
+from yambs.defaults import DEFAULT_CONFIG
 
 LOG = getLogger(__name__)
 
@@ -42,6 +42,19 @@ def add_config_arg(parser: _ArgumentParser) -> None:
     )
 
 
+def add_compiled_config_arg(parser: _ArgumentParser) -> None:
+    """Add an argument for loading 'compile_config' output."""
+
+    parser.add_argument(
+        "--compiled-config",
+        type=_Path,
+        help=(
+            "output of the 'compile_config' command to load configuration "
+            "data from (if it's up-to-date)"
+        ),
+    )
+
+
 def add_common_args(parser: _ArgumentParser) -> None:
     """Add common command-line arguments to a parser."""
 
@@ -75,28 +88,27 @@ def add_common_args(parser: _ArgumentParser) -> None:
 def run_watch(args: _Namespace, src_root: _Path, command: str) -> int:
     """Run the 'watch' command from rcmpy."""
 
-    return (
-        watch(
-            WatchParams(
-                args.dir,
-                src_root,
-                [
-                    executable,
-                    "-m",
-                    PKG_NAME,
-                    "-C",
-                    str(args.dir),
-                    command,
-                    "-s",
-                    "-c",
-                    str(args.config),
-                ],
-                False,  # Don't check file contents.
-                single_pass=args.single_pass,
-            )
+    if not args.watch:
+        return 0
+
+    return watch(
+        WatchParams(
+            args.dir,
+            src_root,
+            [
+                executable,
+                "-m",
+                PKG_NAME,
+                "-C",
+                str(args.dir),
+                command,
+                "-s",
+                "-c",
+                str(args.config),
+            ],
+            False,  # Don't check file contents.
+            single_pass=args.single_pass,
         )
-        if args.watch
-        else 0
     )
 
 
@@ -14,6 +14,7 @@ from vcorelib.io import ARBITER, DEFAULT_INCLUDES_KEY
 
 # internal
 from yambs.commands.common import log_package
+from yambs.paths import loaded_files, write_depfile
 
 
 def compile_config_cmd(args: _Namespace) -> int:
@@ -25,27 +26,33 @@ def compile_config_cmd(args: _Namespace) -> int:
 
     log_package()
 
-    return (
-        0
-        if ARBITER.encode(
-            args.output,
-            merge_dicts(
-                [
-                    ARBITER.decode(
-                        file,
-                        require_success=True,
-                        includes_key=args.includes_key,
-                        expect_overwrite=args.expect_overwrite,
-                        strategy=merge_strat,
-                    ).data
-                    for file in args.inputs
-                ],
-                expect_overwrite=args.expect_overwrite,
-                strategy=merge_strat,
-            ),
-        )[0]
-        else 1
-    )
+    # Keep track of every file loaded (including included files).
+    files: list[Path] = []
+
+    result = ARBITER.encode(
+        args.output,
+        merge_dicts(
+            [
+                ARBITER.decode(
+                    file,
+                    require_success=True,
+                    includes_key=args.includes_key,
+                    expect_overwrite=args.expect_overwrite,
+                    strategy=merge_strat,
+                    files_loaded=files,
+                ).data
+                for file in args.inputs
+            ],
+            expect_overwrite=args.expect_overwrite,
+            strategy=merge_strat,
+        ),
+        sort_keys=not args.keep_order,
+    )[0]
+
+    if result and args.depfile:
+        write_depfile(args.output, loaded_files(args.inputs, files))
+
+    return 0 if result else 1
 
 
 def add_compile_config_cmd(parser: _ArgumentParser) -> _CommandFunction:
@@ -75,6 +82,23 @@ def add_compile_config_cmd(parser: _ArgumentParser) -> _CommandFunction:
         help="allow configuration files to overwrite data when loaded",
     )
 
+    parser.add_argument(
+        "-k",
+        "--keep-order",
+        action="store_true",
+        help="keep keys in the order they were loaded (instead of sorting)",
+    )
+
+    parser.add_argument(
+        "-d",
+        "--depfile",
+        action="store_true",
+        help=(
+            "also write a dependency file (for ninja) listing every "
+            "file loaded, to '<output>.d'"
+        ),
+    )
+
     parser.add_argument("output", type=Path, help="file to write")
     parser.add_argument("inputs", nargs="+", type=Path, help="files to read")
 
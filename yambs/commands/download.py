@@ -11,7 +11,11 @@ from pathlib import Path
 from vcorelib.args import CommandFunction as _CommandFunction
 
 # internal
-from yambs.dependency.github import GithubDependency, default_filt
+from yambs.dependency.github import (
+    DEFAULT_DOWNLOAD_JOBS,
+    GithubDependency,
+    default_filt,
+)
 
 DEFAULT_PATTERN = ".*"
 
@@ -26,6 +30,7 @@ def download_cmd(args: _Namespace) -> int:
     dep.download_release_assets(
         default_filt(args.output.joinpath(args.repo), pattern=args.pattern),
         strict=args.pattern == DEFAULT_PATTERN,
+        jobs=args.jobs,
     )
 
     return 0
@@ -63,4 +68,15 @@ def add_download_cmd(parser: _ArgumentParser) -> _CommandFunction:
         ),
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_DOWNLOAD_JOBS,
+        help=(
+            "number of assets to download (and extract) concurrently "
+            "(default: %(default)s)"
+        ),
+    )
+
     return download_cmd
@@ -10,7 +10,12 @@ from argparse import Namespace as _Namespace
 from vcorelib.args import CommandFunction as _CommandFunction
 
 # internal
-from yambs.commands.common import add_common_args, handle_build, run_watch
+from yambs.commands.common import (
+    add_common_args,
+    add_compiled_config_arg,
+    handle_build,
+    run_watch,
+)
 from yambs.config import Config
 from yambs.environment import BuildEnvironment
 from yambs.generate import generate
@@ -19,7 +24,9 @@ from yambs.generate import generate
 def gen_cmd(args: _Namespace) -> int:
     """Execute the gen command."""
 
-    config = Config.load(path=args.config, root=args.dir)
+    config = Config.load(
+        path=args.config, root=args.dir, compiled=args.compiled_config
+    )
 
     generate(BuildEnvironment(config), sources_only=args.sources)
     handle_build(args)
@@ -31,4 +38,5 @@ def add_gen_cmd(parser: _ArgumentParser) -> _CommandFunction:
     """Add gen-command arguments to its parser."""
 
     add_common_args(parser)
+    add_compiled_config_arg(parser)
     return gen_cmd
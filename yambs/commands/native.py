@@ -12,6 +12,7 @@ from vcorelib.args import CommandFunction as _CommandFunction
 # internal
 from yambs.commands.common import (
     add_common_args,
+    add_compiled_config_arg,
     handle_build,
     log_package,
     run_watch,
@@ -25,9 +26,13 @@ def native_cmd(args: _Namespace) -> int:
 
     log_package()
 
-    config = load_native(path=args.config, root=args.dir)
+    config = load_native(
+        path=args.config, root=args.dir, compiled=args.compiled_config
+    )
 
-    NativeBuildEnvironment(config).generate(sources_only=args.sources)
+    NativeBuildEnvironment(config, jobs=args.jobs).generate(
+        sources_only=args.sources
+    )
     handle_build(args)
 
     return run_watch(args, config.src_root, "native")
@@ -37,4 +42,15 @@ def add_native_cmd(parser: _ArgumentParser) -> _CommandFunction:
     """Add native-command arguments to its parser."""
 
     add_common_args(parser)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "number of threads to use for scanning source directories and "
+            "resolving dependencies (default: %(default)s)"
+        ),
+    )
+    add_compiled_config_arg(parser)
     return native_cmd
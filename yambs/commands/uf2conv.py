@@ -7,8 +7,10 @@ An entry-point for the 'uf2conv' command.
 
 # built-in
 import argparse
+from pathlib import Path
 import sys
 from time import sleep
+from typing import Optional
 
 # third-party
 from vcorelib.args import CommandFunction as _CommandFunction
@@ -27,50 +29,92 @@ def error(msg) -> None:
 def uf2conv_cmd(args: argparse.Namespace) -> int:
     """Execute the uf2conv command."""
 
-    uf2.APPSTARTADDR = int(args.base, 0)
+    base = int(args.base, 0)
+    family_id = 0x0
 
     families = uf2.load_families()
 
     if args.family.upper() in families:
-        uf2.FAMILYID = families[args.family.upper()]
+        family_id = families[args.family.upper()]
     else:
         try:
-            uf2.FAMILYID = int(args.family, 0)
+            family_id = int(args.family, 0)
         except ValueError:
             msg = "Family ID needs to be a number or one of: "
             error(msg + ", ".join(families.keys()))
 
     if args.list:
         uf2.list_drives()
+    elif args.batch or args.manifest:
+        # Convert every image (next to itself) in this one process.
+        paths = [Path(x) for x in args.input]
+        if args.manifest:
+            paths.extend(uf2.manifest_images(Path(args.manifest)))
+
+        pairs = []
+        for path in paths:
+            with path.open("rb") as path_fd:
+                from_uf2 = uf2.is_uf2(path_fd.read(8))
+
+            # UF2 images are skipped (they would be overwritten otherwise).
+            if from_uf2 or path.suffix == ".uf2":
+                print(f"Skipping '{path}' (already UF2).")
+            else:
+                pairs.append((str(path), str(path.with_suffix(".uf2"))))
+
+        for (src, dst), result in zip(
+            pairs, uf2.convert_files(pairs, base, family_id, args.jobs)
+        ):
+            print(
+                (
+                    f"Converted '{src}' -> '{dst}', output size: "
+                    f"{result.size}, start address: "
+                    f"{uf2.address_str(result.start_addr)}"
+                )
+            )
     else:
-        if not args.input:
-            error("Need input file")
+        if len(args.input) != 1:
+            error("Need (exactly one) input file")
+        args.input = args.input[0]
+
+        with open(args.input, mode="rb") as path_fd:
+            from_uf2 = uf2.is_uf2(path_fd.read(8))
+
+        # UF2 input is memory mapped and decoded straight to the output.
+        if from_uf2 and not args.deploy:
+            output = None if args.info else (args.output or "flash.bin")
+            result = uf2.decode_uf2_file(args.input, output, family_id, base)
+            if output is not None:
+                print(
+                    (
+                        f"Converted to bin, output size: {result.size}, "
+                        "start address: "
+                        f"{uf2.address_str(result.start_addr)}"
+                    )
+                )
+                print(f"Wrote {result.size} bytes to {output}")
+            return 0
+
         with open(args.input, mode="rb") as path_fd:
             inpbuf = path_fd.read()
 
-        from_uf2 = uf2.is_uf2(inpbuf)
         ext = "uf2"
+        start: Optional[int] = base
         if args.deploy:  # pragma: nocover
             outbuf = inpbuf
-        elif from_uf2 and not args.info:
-            outbuf = uf2.convert_from_uf2(inpbuf)
-            ext = "bin"
-        elif from_uf2 and args.info:
-            outbuf = b""
-            uf2.convert_from_uf2(inpbuf)
         elif uf2.is_hex(inpbuf):
-            outbuf = uf2.convert_from_hex_to_uf2(inpbuf.decode("utf-8"))
+            outbuf, start = uf2.encode_hex(inpbuf.decode("utf-8"), family_id)
         elif args.carray:
             outbuf = uf2.convert_to_carray(inpbuf)
             ext = "h"
         else:
-            outbuf = uf2.convert_to_uf2(inpbuf)
+            outbuf = uf2.encode_uf2(inpbuf, base, family_id)
 
         if not args.deploy and not args.info:
             print(
                 (
                     f"Converted to {ext}, output size: {len(outbuf)}, "
-                    f"start address: 0x{uf2.APPSTARTADDR:x}"
+                    f"start address: {uf2.address_str(start)}"
                 )
             )
         if args.convert or ext != "uf2":
@@ -105,8 +149,8 @@ def add_uf2conv_cmd(parser: argparse.ArgumentParser) -> _CommandFunction:
         "input",
         metavar="INPUT",
         type=str,
-        nargs="?",
-        help="input file (HEX, BIN or UF2)",
+        nargs="*",
+        help="input file (HEX, BIN or UF2), or files with -B",
     )
     parser.add_argument(
         "-b",
@@ -174,5 +218,30 @@ def add_uf2conv_cmd(parser: argparse.ArgumentParser) -> _CommandFunction:
         action="store_true",
         help="display header information from UF2, do not convert",
     )
+    parser.add_argument(
+        "-B",
+        "--batch",
+        action="store_true",
+        help=(
+            "convert every input (HEX or BIN) to a UF2 file next to it, "
+            "in one process"
+        ),
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        metavar="MANIFEST",
+        help=(
+            "also batch convert the built applications in a manifest "
+            "(e.g. apps.json or board_apps.json)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=uf2.DEFAULT_CONVERT_JOBS,
+        type=int,
+        help="number of files to convert concurrently (default: %(default)s)",
+    )
 
     return uf2conv_cmd
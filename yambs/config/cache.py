@@ -0,0 +1,95 @@
+"""
+A module for persisting merged (and validated) configuration data.
+"""
+
+# built-in
+from hashlib import sha256
+from pathlib import Path
+from time import time_ns
+from typing import Any, Dict, Iterable, List, Optional
+
+# third-party
+from vcorelib.io import ARBITER
+from vcorelib.io.types import JsonObject
+from vcorelib.paths import stats
+
+# internal
+from yambs import VERSION
+from yambs.paths import RACY_WINDOW_NS, encode_if_changed, user_cache_dir
+
+# Modification times and sizes by path (None for files that don't exist).
+FileStates = Dict[str, Optional[List[int]]]
+
+
+def file_states(paths: Iterable[Path]) -> FileStates:
+    """Get the current state of some files."""
+
+    result: FileStates = {}
+    for path in paths:
+        stat = stats(path)
+        result[str(path)] = (
+            None if stat is None else [stat.st_mtime_ns, stat.st_size]
+        )
+    return result
+
+
+class ConfigCache:
+    """
+    A class for re-using configuration data from a previous run (as long as
+    none of the files that it was created from changed).
+    """
+
+    def __init__(self, *key: str) -> None:
+        """Initialize this instance."""
+
+        hasher = sha256()
+        for part in (VERSION, *key):
+            hasher.update(part.encode())
+            hasher.update(b"\0")
+
+        self.path = user_cache_dir("configs").joinpath(
+            f"{hasher.hexdigest()[:32]}.json"
+        )
+
+        # The files that loaded data was created from.
+        self.files: List[Path] = []
+
+    def load(self) -> Optional[JsonObject]:
+        """Load configuration data (if it's still valid)."""
+
+        if not self.path.is_file():
+            return None
+
+        cached: Dict[str, Any] = ARBITER.decode(self.path).data
+        files = cached.get("files")
+
+        if not files or file_states(Path(x) for x in files) != files:
+            return None
+
+        self.files = [Path(x) for x in files]
+        return cached["data"]  # type: ignore
+
+    def save(self, files: Iterable[Path], data: JsonObject) -> bool:
+        """
+        Persist configuration data (and the state of the files it was
+        created from). Return whether or not anything was written.
+        """
+
+        states = file_states(files)
+
+        # Don't persist data derived from files that may still be changing.
+        trusted_before = time_ns() - RACY_WINDOW_NS
+        if any(
+            x is not None and x[0] >= trusted_before for x in states.values()
+        ):
+            return False
+
+        # Key order is significant (e.g. for variants).
+        payload: Dict[str, Any] = {"files": states, "data": data}
+
+        # The cache is optional (it may not be writable).
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            return encode_if_changed(self.path, payload, sort_keys=False)
+        except OSError:
+            return False
@@ -5,7 +5,7 @@ A module for common configuration interfaces.
 # built-in
 from pathlib import Path
 from sys import executable
-from typing import Any, Dict, NamedTuple, Optional, Set, Type, TypeVar
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Type, TypeVar
 
 # third-party
 from vcorelib.dict import merge
@@ -17,11 +17,14 @@ from vcorelib.paths import Pathlike, find_file, normalize
 
 # internal
 from yambs import PKG_NAME
+from yambs.config.cache import ConfigCache, file_states
+from yambs.defaults import DEFAULT_CONFIG
 from yambs.dependency.config import Dependency
+from yambs.paths import loaded_files, read_depfile
+from yambs.schemas import PACKAGE_SCHEMAS, TRUSTED_SCHEMAS
 from yambs.schemas import YambsDictCodec as _YambsDictCodec
 
 T = TypeVar("T", bound="CommonConfig")
-DEFAULT_CONFIG = f"{PKG_NAME}.yaml"
 
 
 class Project(NamedTuple):
@@ -65,6 +68,34 @@ class Project(NamedTuple):
         return f"{self.name}-{self.version}"
 
 
+def load_compiled(
+    compiled: Path, src_config: Path, path: Path
+) -> tuple[Optional[Dict[str, Any]], List[Path]]:
+    """
+    Load merged configuration data written by the 'compile_config' command
+    (if it was compiled from the same configuration files and is newer than
+    all of them).
+    """
+
+    inputs = read_depfile(compiled)
+    if not inputs or not compiled.is_file():
+        return None, []
+
+    # The package configuration must have been loaded first.
+    resolved = [x.resolve() for x in inputs]
+    if resolved[0] != src_config.resolve() or path.resolve() not in resolved:
+        return None, []
+
+    newest = compiled.stat().st_mtime_ns
+    if any(x is None or x[0] >= newest for x in file_states(inputs).values()):
+        return None, []
+
+    return (
+        _ARBITER.decode(compiled, require_success=True).data,
+        inputs,
+    )
+
+
 class CommonConfig(_YambsDictCodec, _BasicDictCodec):
     """A common, base configuration."""
 
@@ -79,6 +110,9 @@ class CommonConfig(_YambsDictCodec, _BasicDictCodec):
 
     file: Optional[Path]
 
+    # Every file that the configuration data was loaded from.
+    files: List[Path]
+
     dependencies: Set[Dependency]
 
     def directory(
@@ -113,6 +147,7 @@ class CommonConfig(_YambsDictCodec, _BasicDictCodec):
         self.third_party_root = self.directory("third_party_root")
 
         self.file = None
+        self.files = []
 
         self.project = Project.create(data["project"])  # type: ignore
 
@@ -124,9 +159,9 @@ class CommonConfig(_YambsDictCodec, _BasicDictCodec):
             self.dependencies.add(new_dep)
 
     @property
-    def third_party_script(self) -> Path:
-        """Get the path to the third-party build script."""
-        return self.ninja_root.joinpath("third_party.sh")
+    def third_party_ninja(self) -> Path:
+        """Get the path to the third-party build instructions."""
+        return self.ninja_root.joinpath("third_party.ninja")
 
     @classmethod
     def load(
@@ -134,33 +169,77 @@ class CommonConfig(_YambsDictCodec, _BasicDictCodec):
         path: Pathlike = DEFAULT_CONFIG,
         package_config: str = DEFAULT_CONFIG,
         root: Pathlike = None,
+        compiled: Pathlike = None,
     ) -> T:
-        """Load a configuration."""
+        """
+        Load a configuration (optionally from the output of the
+        'compile_config' command, if it's still up-to-date).
+        """
 
         src_config = find_file(package_config, package=PKG_NAME)
         assert src_config is not None
 
         path = normalize(path)
 
-        data = merge(
-            _ARBITER.decode(
-                src_config,
-                includes_key=DEFAULT_INCLUDES_KEY,
-                require_success=True,
-            ).data,
-            _ARBITER.decode(path, includes_key=DEFAULT_INCLUDES_KEY).data,
-            # Always allow the project-specific configuration to override
-            # package data.
-            expect_overwrite=True,
+        # Re-use merged and validated data from a previous run if none of the
+        # files it was loaded from changed.
+        cache = ConfigCache(
+            cls.__name__,
+            # Schemas provide default values.
+            PACKAGE_SCHEMAS.digest,
+            str(src_config),
+            str(path),
+            str(root),
+            str(Path.cwd()),
         )
-
-        if root is not None:
-            data["root"] = str(normalize(root))
-
-        result = cls.create(data)
+        cached = cache.load()
+
+        compiled_data = None
+        inputs: List[Path] = []
+        if cached is None and compiled is not None:
+            compiled_data, inputs = load_compiled(
+                normalize(compiled), src_config, path
+            )
+
+        if cached is not None:
+            result = cls.create(cached, schemas=TRUSTED_SCHEMAS)
+            result.files = cache.files
+        elif compiled_data is not None:
+            if root is not None:
+                compiled_data["root"] = str(normalize(root))
+
+            result = cls.create(compiled_data)
+            result.files = inputs + [path]
+            cache.save(result.files, result.data)
+        else:
+            # Keep track of every file that contributes to the configuration.
+            files: List[Path] = [path]
+
+            data = merge(
+                _ARBITER.decode(
+                    src_config,
+                    includes_key=DEFAULT_INCLUDES_KEY,
+                    require_success=True,
+                    files_loaded=files,
+                ).data,
+                _ARBITER.decode(
+                    path, includes_key=DEFAULT_INCLUDES_KEY, files_loaded=files
+                ).data,
+                # Always allow the project-specific configuration to override
+                # package data.
+                expect_overwrite=True,
+            )
+
+            if root is not None:
+                data["root"] = str(normalize(root))
+
+            result = cls.create(data)
+            result.files = loaded_files([src_config, path], files)
+            cache.save(result.files, result.data)
 
         if path.is_file():
             result.file = path
             result.data["config_file"] = str(path)
+        result.data["package_config"] = str(src_config)
 
         return result
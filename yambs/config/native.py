@@ -6,7 +6,8 @@ A module implementing a configuration interface for native builds.
 from vcorelib.paths import Pathlike
 
 # internal
-from yambs.config.common import DEFAULT_CONFIG, CommonConfig
+from yambs.config.common import CommonConfig
+from yambs.defaults import DEFAULT_CONFIG
 
 
 class Native(CommonConfig):
@@ -18,7 +19,11 @@ class Native(CommonConfig):
 
 
 def load_native(
-    path: Pathlike = DEFAULT_CONFIG, root: Pathlike = None
+    path: Pathlike = DEFAULT_CONFIG,
+    root: Pathlike = None,
+    compiled: Pathlike = None,
 ) -> Native:
     """Load a native configuration object."""
-    return Native.load(path=path, root=root, package_config="native.yaml")
+    return Native.load(
+        path=path, root=root, package_config="native.yaml", compiled=compiled
+    )
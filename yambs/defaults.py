@@ -0,0 +1,9 @@
+"""
+Package defaults that are needed without importing heavier modules (e.g. when
+only building the command-line interface).
+"""
+
+# internal
+from yambs import PKG_NAME
+
+DEFAULT_CONFIG = f"{PKG_NAME}.yaml"
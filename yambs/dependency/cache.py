@@ -0,0 +1,337 @@
+"""
+A module implementing a shared, content-addressed cache for extracted
+dependency release archives.
+"""
+
+# built-in
+from contextlib import contextmanager
+import hashlib
+from os import fstat, getpid, link, replace, utime
+from pathlib import Path
+from shutil import copy2, copytree, rmtree
+import sys
+import tarfile
+from threading import get_ident
+from typing import IO, Any, Callable, Iterator, List, NamedTuple
+
+# third-party
+from vcorelib.paths import stats
+
+# internal
+from yambs.paths import user_cache_dir
+
+if sys.platform == "win32":  # pragma: nocover
+    import msvcrt  # pylint: disable=import-error
+else:
+    import fcntl
+
+CHUNK_SIZE = 1024 * 1024
+
+# Top-level directories of an extracted release that building it writes to
+# (files in them, and top-level files, are copied instead of linked so that
+# writes never reach the shared cache entry).
+MUTABLE_DIRS = frozenset({"build", "dist", "ninja", "third-party"})
+
+
+def tmp_suffix() -> str:
+    """Get a suffix for temporary paths unique to this process and thread."""
+    return f"{getpid()}.{get_ident()}"
+
+
+def lock_fd(path_fd: IO[bytes]) -> None:
+    """Lock an open file exclusively (wait for the lock if necessary)."""
+
+    if sys.platform == "win32":  # pragma: nocover
+        path_fd.seek(0)
+        while True:
+            try:
+                msvcrt.locking(path_fd.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                pass
+    else:
+        fcntl.flock(path_fd, fcntl.LOCK_EX)
+
+
+def unlock_fd(path_fd: IO[bytes]) -> None:
+    """Unlock an open file."""
+
+    if sys.platform == "win32":  # pragma: nocover
+        path_fd.seek(0)
+        msvcrt.locking(path_fd.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(path_fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a file (between processes and threads, for the
+    duration of the context). The holder may remove the lock file, anyone
+    waiting on it locks a new one instead.
+    """
+
+    while True:
+        with path.open("a+b") as path_fd:
+            lock_fd(path_fd)
+            try:
+                # Make sure the lock file wasn't removed while waiting.
+                stat = stats(path)
+                if (
+                    stat is not None
+                    and stat.st_ino == fstat(path_fd.fileno()).st_ino
+                ):
+                    yield
+                    return
+            finally:
+                unlock_fd(path_fd)
+
+
+class HashingReader:
+    """A file-like object that hashes data as it's read."""
+
+    def __init__(self, stream: IO[bytes], algorithm: str) -> None:
+        """Initialize this instance."""
+
+        self.stream = stream
+        self.hasher = hashlib.new(algorithm)
+
+    def read(self, size: int = -1) -> bytes:
+        """Read (and hash) data."""
+
+        data = self.stream.read(size)
+        self.hasher.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """Finish reading the stream and get its digest."""
+
+        while self.read(CHUNK_SIZE):
+            pass
+        return self.hasher.hexdigest()
+
+
+def extract_verified(
+    path: Path, dst: Path, digest: str, algorithm: str = "sha256"
+) -> None:
+    """
+    Extract a tar archive while verifying its digest (the archive is only
+    read once). Nothing is left behind in the destination if the digest
+    doesn't match.
+    """
+
+    try:
+        with path.open("rb") as path_fd:
+            reader = HashingReader(path_fd, algorithm)
+            with tarfile.open(
+                fileobj=reader, mode="r|*"  # type: ignore
+            ) as tar:
+                tar.extractall(dst, filter="tar")
+
+            actual = reader.hexdigest()
+            if actual != digest:
+                raise ValueError(
+                    f"Hash ({algorithm}) of '{path}' expected "
+                    f"'{digest}' got '{actual}'!"
+                )
+    except BaseException:
+        rmtree(dst, ignore_errors=True)
+        raise
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Hard-link a file (or copy it if linking isn't possible)."""
+
+    try:
+        link(src, dst)
+    except OSError:
+        copy2(src, dst)
+
+
+def link_tree(
+    src: Path, dst: Path, mutable: frozenset[str] = MUTABLE_DIRS
+) -> None:
+    """
+    Create a directory tree made of hard links to another (so that files
+    aren't duplicated, but the new tree is otherwise independent). Top-level
+    files, and files in 'mutable' top-level directories, are copied since
+    they may be written to in place.
+    """
+
+    def copy_function(path: str, dest: str) -> None:
+        """Link (or copy) a file."""
+
+        parts = Path(path).relative_to(src).parts
+        if len(parts) == 1 or parts[0] in mutable:
+            copy2(path, dest)
+        else:
+            link_or_copy(path, dest)
+
+    tmp = dst.with_name(f".{dst.name}.{tmp_suffix()}")
+    rmtree(tmp, ignore_errors=True)
+    copytree(src, tmp, symlinks=True, copy_function=copy_function)
+
+    try:
+        replace(tmp, dst)
+    except OSError:
+        # Another process (or thread) may have created the tree first.
+        rmtree(tmp, ignore_errors=True)
+        if not dst.is_dir():
+            raise
+
+
+def tree_size(path: Path) -> int:
+    """Get the total size of the files in a directory tree."""
+
+    return sum(
+        x.lstat().st_size
+        for x in path.rglob("*")
+        if x.is_file() and not x.is_symlink()
+    )
+
+
+class CacheEntry(NamedTuple):
+    """Information about a cache entry."""
+
+    path: Path
+    size: int
+
+    # The last time that this entry was used.
+    used_ns: int
+
+
+class ArtifactCache:
+    """
+    A class for sharing downloaded (and extracted) release archives between
+    projects. Entries are keyed by the archive's digest.
+    """
+
+    def __init__(self, root: Path = None) -> None:
+        """Initialize this instance."""
+
+        if root is None:
+            root = user_cache_dir("artifacts")
+        self.root = root
+
+    def entry(self, digest: str) -> Path:
+        """Get the directory for a cache entry."""
+        return self.root.joinpath(digest)
+
+    @contextmanager
+    def locked(self, digest: str) -> Iterator[Path]:
+        """
+        Hold a cache entry's lock (entries are only populated, used and
+        evicted while it's held).
+        """
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.root.joinpath(f"{digest}.lock")):
+            yield self.entry(digest)
+
+    def ensure(
+        self,
+        digest: str,
+        archive: str,
+        name: str,
+        download: Callable[[Path], Any],
+        algorithm: str = "sha256",
+        dst: Path = None,
+    ) -> Path:
+        """
+        Get the path to an extracted (tar) archive, downloading, verifying
+        and extracting it first if it's not already cached. If a destination
+        is provided, the result is linked there (before the entry can be
+        evicted).
+        """
+
+        with self.locked(digest) as entry:
+            result = entry.joinpath(name)
+            if not result.is_dir():
+                entry.mkdir(exist_ok=True)
+                self._populate(
+                    entry, digest, archive, name, download, algorithm
+                )
+
+            if dst is not None:
+                link_tree(result, dst)
+
+            # Keep track of when this entry was last used.
+            utime(entry)
+
+        return result
+
+    @staticmethod
+    def _populate(
+        entry: Path,
+        digest: str,
+        archive: str,
+        name: str,
+        download: Callable[[Path], Any],
+        algorithm: str,
+    ) -> None:
+        """Download, verify and extract an archive into a cache entry."""
+
+        path = entry.joinpath(archive)
+        download(path)
+
+        # Extract to a temporary location first so that a partially
+        # extracted archive is never used.
+        tmp = entry.joinpath(f".extract.{tmp_suffix()}")
+        rmtree(tmp, ignore_errors=True)
+        try:
+            extract_verified(path, tmp, digest, algorithm=algorithm)
+        except ValueError:
+            # Don't keep corrupt downloads around.
+            path.unlink(missing_ok=True)
+            raise
+
+        replace(tmp.joinpath(name), entry.joinpath(name))
+        rmtree(tmp, ignore_errors=True)
+
+        # The archive itself isn't needed anymore.
+        path.unlink(missing_ok=True)
+
+    def entries(self) -> List[CacheEntry]:
+        """Get all cache entries (least-recently used first)."""
+
+        result = []
+        if self.root.is_dir():
+            for path in self.root.iterdir():
+                if path.is_dir():
+                    result.append(
+                        CacheEntry(
+                            path, tree_size(path), path.stat().st_mtime_ns
+                        )
+                    )
+
+        result.sort(key=lambda x: (x.used_ns, str(x.path)))
+        return result
+
+    def evict(self, max_size: int) -> List[CacheEntry]:
+        """
+        Remove least-recently used entries until the cache is no larger than
+        a maximum size (in bytes). Return the entries that were removed.
+        """
+
+        entries = self.entries()
+        size = sum(x.size for x in entries)
+
+        removed = []
+        for entry in entries:
+            if size <= max_size:
+                break
+
+            # Entries aren't removed while they're in use (or if they were
+            # used since they were listed).
+            with self.locked(entry.path.name) as path:
+                stat = stats(path)
+                if stat is not None:
+                    if stat.st_mtime_ns != entry.used_ns:
+                        continue
+                    rmtree(path)
+                    removed.append(entry)
+
+                size -= entry.size
+                path.with_name(f"{path.name}.lock").unlink()
+
+        return removed
@@ -3,12 +3,14 @@ A module implementing GitHub dependency interactions.
 """
 
 # built-in
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from os import replace
 from pathlib import Path
 from re import search
 from typing import Any, Callable, Dict, Optional
 
 # third-party
-import requests
 from vcorelib.io.archive import extractall
 from vcorelib.io.types import FileExtension
 from vcorelib.logging import LoggerMixin, LoggerType
@@ -16,20 +18,94 @@ from vcorelib.math import nano_str
 
 # internal
 from yambs.github import DEFAULT_RELEASE, ReleaseData, release_data
+from yambs.github.session import session
+from yambs.paths import sorted_paths
 
 AssetFilter = Callable[[dict[str, Any]], Optional[Path]]
 
 
-def download_file_if_missing(
-    uri: str, dest: Path, timeout: float = 10.0, chunk_size: int = 4096
-) -> None:
-    """Download a file if necessary."""
+# Release assets are downloaded (and extracted) concurrently.
+DEFAULT_DOWNLOAD_JOBS = 4
+
+# Large chunks keep per-chunk overhead low while using constant memory.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def partial_path(dest: Path) -> Path:
+    """Get the path that a download is written to before it's complete."""
+    return dest.with_name(dest.name + ".part")
 
-    if not dest.is_file():
-        req = requests.get(uri, timeout=timeout)
-        with dest.open("wb") as dest_fd:
-            for chunk in req.iter_content(chunk_size=chunk_size):
-                dest_fd.write(chunk)
+
+def download_file_if_missing(
+    uri: str,
+    dest: Path,
+    timeout: float = 10.0,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    digest: str = None,
+) -> bool:
+    """
+    Download a file if necessary (return whether or not it was downloaded).
+    Data is streamed to a partial file which is renamed once complete, so an
+    interrupted download is never mistaken for a complete one (and is resumed
+    by the next attempt, if the server supports range requests). If a digest
+    (e.g. 'sha256:<hex>') is provided, the downloaded data is verified as it's
+    streamed.
+    """
+
+    if dest.is_file():
+        return False
+
+    hasher = None
+    if digest:
+        algorithm, _ = digest.split(":", maxsplit=1)
+        hasher = hashlib.new(algorithm)
+
+    part = partial_path(dest)
+    offset = part.stat().st_size if part.is_file() else 0
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session().get(
+        uri, timeout=timeout, stream=True, headers=headers
+    ) as req:
+        # The partial file may already be complete.
+        complete = offset and req.status_code == 416
+
+        # Without a digest, a partial file that's as large as (or larger
+        # than) the asset can't be trusted (it may be from a different
+        # asset), so it's discarded.
+        restart = complete and hasher is None
+
+        # Range requests aren't always honored (start over if not).
+        if req.status_code != 206 and not complete:
+            offset = 0
+            req.raise_for_status()
+
+        if not restart:
+            with part.open("r+b" if offset else "wb") as dest_fd:
+                if offset:
+                    # Account for data that was already downloaded.
+                    if hasher is not None:
+                        while chunk := dest_fd.read(chunk_size):
+                            hasher.update(chunk)
+                    dest_fd.seek(offset)
+                    dest_fd.truncate()
+
+                if not complete:
+                    for chunk in req.iter_content(chunk_size=chunk_size):
+                        dest_fd.write(chunk)
+                        if hasher is not None:
+                            hasher.update(chunk)
+
+    if restart:
+        part.unlink()
+        return download_file_if_missing(uri, dest, timeout, chunk_size)
+
+    if hasher is not None and digest != f"{hasher.name}:{hasher.hexdigest()}":
+        part.unlink()
+        raise ValueError(f"Digest mismatch for '{uri}' (expected {digest}).")
+
+    replace(part, dest)
+    return True
 
 
 def default_filt(
@@ -54,30 +130,55 @@ def default_filt(
     return filt
 
 
-def ensure_extracted(
-    path: Path, strict: bool = True, logger: LoggerType = None
+def extract_archive(
+    item: Path, dest: Path, strict: bool = True, logger: LoggerType = None
 ) -> None:
-    """Ensure that all archive files in a directory are extracted."""
+    """Extract an archive (next to itself)."""
 
-    for item in path.iterdir():
-        ext = FileExtension.from_path(item)
-        if ext is not None and ext.is_archive() and item.is_file():
-            dest = item.parent.joinpath(item.name.replace(f".{ext}", ""))
-            if not dest.is_dir():
-                if logger is not None:
-                    logger.info("Extracting '%s' -> '%s'.", item, dest)
+    if logger is not None:
+        logger.info("Extracting '%s' -> '%s'.", item, dest)
 
-                result = extractall(item, dst=item.parent)
-                assert result[0]
+    result = extractall(item, dst=item.parent)
+    assert result[0]
 
-                if logger is not None:
-                    logger.info(
-                        "Extracted '%s' in %s.",
-                        dest,
-                        nano_str(result[1], is_time=True),
-                    )
+    if logger is not None:
+        logger.info(
+            "Extracted '%s' in %s.",
+            dest,
+            nano_str(result[1], is_time=True),
+        )
+
+    assert not strict or dest.is_dir(), dest
+
+
+def ensure_extracted(
+    path: Path, strict: bool = True, logger: LoggerType = None, jobs: int = 1
+) -> None:
+    """
+    Ensure that all archive files in a directory are extracted (archives are
+    extracted in parallel).
+    """
 
-                assert not strict or dest.is_dir(), dest
+    to_extract = []
+    for item in sorted_paths(path.iterdir()):
+        ext = FileExtension.from_path(item)
+        if ext is not None and ext.is_archive() and item.is_file():
+            # Remove whichever of the extension's suffixes matched.
+            suffix = max(
+                (x for x in ext.value if item.name.endswith(f".{x}")),
+                key=len,
+                default="",
+            )
+            dest = item.with_name(item.name[: -len(suffix) - 1])
+            if suffix and not dest.is_dir():
+                to_extract.append((item, dest))
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for future in [
+            executor.submit(extract_archive, item, dest, strict, logger)
+            for item, dest in to_extract
+        ]:
+            future.result()
 
 
 class GithubDependency(LoggerMixin):
@@ -113,16 +214,36 @@ class GithubDependency(LoggerMixin):
         }
 
     def download_release_assets(
-        self, filt: AssetFilter, extract: bool = True, strict: bool = True
+        self,
+        filt: AssetFilter,
+        extract: bool = True,
+        strict: bool = True,
+        jobs: int = DEFAULT_DOWNLOAD_JOBS,
     ) -> None:
-        """Ensure release assets are downloaded."""
+        """
+        Ensure release assets are downloaded (concurrently). Archives are
+        extracted once all downloads are complete.
+        """
 
+        downloads = []
         for asset in self.data["assets"]:
             dest = filt(asset)
             if dest is not None:
-                download_file_if_missing(asset["browser_download_url"], dest)
-
-                if extract:
-                    ensure_extracted(
-                        dest.parent, strict=strict, logger=self.logger
-                    )
+                downloads.append(
+                    (asset["browser_download_url"], dest, asset.get("digest"))
+                )
+
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            for future in [
+                executor.submit(
+                    download_file_if_missing, uri, dest, digest=digest
+                )
+                for uri, dest, digest in downloads
+            ]:
+                future.result()
+
+        if extract:
+            for directory in dict.fromkeys(x[1].parent for x in downloads):
+                ensure_extracted(
+                    directory, strict=strict, logger=self.logger, jobs=jobs
+                )
@@ -7,9 +7,15 @@ from typing import Dict
 
 # internal
 from yambs.dependency.config import DependencyKind
-from yambs.dependency.handlers.types import DependencyHandler
-from yambs.dependency.handlers.yambs import yambs_handler
+from yambs.dependency.handlers.types import (
+    DependencyFingerprint,
+    DependencyHandler,
+)
+from yambs.dependency.handlers.yambs import yambs_fingerprint, yambs_handler
 
 HANDLERS: Dict[DependencyKind, DependencyHandler] = {
     DependencyKind.YAMBS: yambs_handler
 }
+FINGERPRINTS: Dict[DependencyKind, DependencyFingerprint] = {
+    DependencyKind.YAMBS: yambs_fingerprint
+}
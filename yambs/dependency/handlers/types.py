@@ -4,7 +4,7 @@ A module declaring shared types.
 
 # built-in
 from pathlib import Path
-from typing import Callable, List, NamedTuple, Set
+from typing import Callable, List, NamedTuple, Optional, Set
 
 # internal
 from yambs.dependency.config import Dependency, DependencyData
@@ -34,3 +34,6 @@ class DependencyTask(NamedTuple):
 
 
 DependencyHandler = Callable[[DependencyTask], DependencyState]
+
+# A summary of a dependency's current state (None if it can't be determined).
+DependencyFingerprint = Callable[[DependencyTask], Optional[str]]
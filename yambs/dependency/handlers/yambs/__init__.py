@@ -3,15 +3,19 @@ A module implementing a dependency handler for other yambs projects.
 """
 
 # built-in
+from hashlib import sha256
+import json
 from pathlib import Path
 from sys import executable
-from typing import Set
+from typing import Optional, Set
 
 # third-party
-from vcorelib.paths import rel
+from vcorelib.paths import rel, stats
 
 # internal
 from yambs import PKG_NAME
+from yambs.config.cache import file_states
+from yambs.defaults import DEFAULT_CONFIG
 from yambs.dependency.config import (
     Dependency,
     DependencyData,
@@ -53,7 +57,7 @@ def handle_source(task: DependencyTask) -> Path:
         audit_downloads(
             task.root, task.data, github_release(task.dep, task.data)
         )
-        directory = audit_extract(task.root, task.data)
+        directory = audit_extract(task.data)
 
     elif task.dep.source == DependencySource.DIRECTORY:
         assert task.dep.directory is not None
@@ -143,3 +147,53 @@ def yambs_handler(task: DependencyTask) -> DependencyState:
     )
 
     return task.current
+
+
+def yambs_fingerprint(task: DependencyTask) -> Optional[str]:
+    """
+    Summarize a yambs dependency's current state: its specification and
+    version, its configuration files and its static library (if it's built).
+    """
+
+    if "name" not in task.data:
+        return None
+
+    directory = None
+    if task.dep.source == DependencySource.GITHUB:
+        if "directory" in task.data:
+            directory = Path(task.data["directory"])
+    elif task.dep.directory is not None:
+        directory = task.project_root.joinpath(task.dep.directory)
+
+    if directory is None:
+        return None
+
+    config = directory.joinpath(DEFAULT_CONFIG)
+    if not config.is_file():
+        return None
+
+    hasher = sha256()
+    hasher.update(json.dumps(task.dep.asdict(), sort_keys=True).encode())
+    hasher.update(str(task.data.get("version")).encode())
+    hasher.update(config.read_bytes())
+
+    # Included configuration files can change independently.
+    hasher.update(
+        json.dumps(
+            file_states(
+                [config] + [Path(x) for x in task.data.get("config_files", [])]
+            ),
+            sort_keys=True,
+        ).encode()
+    )
+
+    static_lib = task.data.get("static_library")
+    stat = stats(static_lib) if static_lib else None
+    hasher.update(str(stat.st_mtime_ns if stat else None).encode())
+
+    # Links created by the handler must still exist.
+    hasher.update(
+        str(task.include.joinpath(task.data["name"]).is_symlink()).encode()
+    )
+
+    return hasher.hexdigest()
@@ -10,8 +10,8 @@ from typing import Optional, Tuple
 from vcorelib.paths import Pathlike, normalize
 
 # internal
-from yambs.config.common import DEFAULT_CONFIG
 from yambs.config.native import Native, load_native
+from yambs.defaults import DEFAULT_CONFIG
 from yambs.dependency.config import DependencyData
 from yambs.dependency.handlers.types import DependencyTask
 
@@ -92,4 +92,8 @@ def audit_config_load(
         # It's not necessary to keep track of the entire configuration.
         data["dependencies"] = [x.asdict() for x in config.dependencies]
 
+        # Keep track of the files the configuration was loaded from (so that
+        # changes can be detected without loading it again).
+        data["config_files"] = [str(x) for x in config.files]
+
     return data
@@ -4,15 +4,15 @@ A module with interfaces for working with yambs projects found on GitHub.
 
 # built-in
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 # third-party
-from vcorelib.io.archive import extractall
-from vcorelib.paths import validate_hex_digest
+from vcorelib import DEFAULT_ENCODING
 
 # internal
+from yambs.dependency.cache import ArtifactCache
 from yambs.dependency.config import Dependency, DependencyData
-from yambs.dependency.github import GithubDependency
+from yambs.dependency.github import GithubDependency, download_file_if_missing
 
 TARBALL = ".tar.xz"
 
@@ -43,9 +43,10 @@ def github_release(dep: Dependency, data: DependencyData) -> GithubDependency:
 def audit_downloads(
     root: Path, data: DependencyData, github: GithubDependency
 ) -> None:
-    """Ensure release assets are downloaded."""
-
-    to_download = ["sum", TARBALL]
+    """
+    Ensure release checksums are downloaded (the release archive itself is
+    only downloaded if it's not already cached).
+    """
 
     def filt(asset: dict[str, Any]) -> Optional[Path]:
         """Determine if the release asset should be downloaded."""
@@ -55,41 +56,72 @@ def audit_downloads(
         name = asset["name"]
         dest = root.joinpath(name)
 
-        for suffix in to_download:
-            if name.endswith(suffix):
-                data["assets"][suffix] = str(dest)
-                result = dest
+        if name.endswith("sum"):
+            data["assets"]["sum"] = str(dest)
+            result = dest
+        elif name.endswith(TARBALL):
+            data["assets"][TARBALL] = str(dest)
+            data["assets"]["url"] = asset["browser_download_url"]
 
         return result
 
-    github.download_release_assets(filt)
+    github.download_release_assets(filt, extract=False)
+
+
+def read_hex_digest(path: Path, name: str) -> Tuple[str, str]:
+    """
+    Get the algorithm and expected digest for a file from a hex-digest file
+    (e.g. 'sha256sum' output).
+    """
+
+    algorithm = path.suffix[1:-3]
+
+    with path.open("r", encoding=DEFAULT_ENCODING) as path_fd:
+        for line in path_fd:
+            parts = line.split()
+            if len(parts) == 2 and parts[1].lstrip("*") == name:
+                return algorithm, parts[0]
+
+    raise KeyError(f"No digest for '{name}' in '{path}'!")
 
 
-def audit_extract(root: Path, data: DependencyData) -> Path:
+def audit_extract(data: DependencyData, cache: ArtifactCache = None) -> Path:
     """
-    Ensure the release is extracted (and the archive contents are verified).
+    Ensure the release is extracted (archives are downloaded, verified and
+    extracted once per machine, then linked into the project).
     """
 
     if "directory" not in data:
         # The expected directory is just the name of the tarball with no
         # suffix.
         assert TARBALL in data["assets"], data["assets"]
-        expected = Path(data["assets"][TARBALL].replace(TARBALL, ""))
+        tarball = Path(data["assets"][TARBALL])
+        expected = Path(str(tarball).replace(TARBALL, ""))
 
         # The name of the project is the directory name without the version
         # suffix.
         data["slug"] = expected.name
         data["name"] = data["slug"].replace(f"-{data['version']}", "")
 
-        # check if need to un-archive, if so, verify checksum.
         if not expected.is_dir():
-            validate_hex_digest(data["assets"]["sum"], root=root)
-            assert extractall(
-                data["assets"][TARBALL],
-                dst=root,
-                maxsplit=1 + expected.name.count("."),
-            )[0]
-            assert expected.is_dir()
+            if cache is None:
+                cache = ArtifactCache()
+
+            algorithm, digest = read_hex_digest(
+                Path(data["assets"]["sum"]), tarball.name
+            )
+
+            cache.ensure(
+                digest,
+                tarball.name,
+                expected.name,
+                # The digest is verified during extraction.
+                lambda path: download_file_if_missing(
+                    data["assets"]["url"], path
+                ),
+                algorithm=algorithm,
+                dst=expected,
+            )
 
         data["directory"] = str(expected)
 
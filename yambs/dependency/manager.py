@@ -3,43 +3,75 @@ A module implementing a dependency manager.
 """
 
 # built-in
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
 
 # third-party
 from vcorelib.io import ARBITER
 from vcorelib.logging import LoggerType
-from vcorelib.paths import rel, set_exec_flags
+from vcorelib.paths import rel
 
 # internal
 from yambs.dependency.config import Dependency, DependencyData
-from yambs.dependency.handlers import HANDLERS
+from yambs.dependency.handlers import FINGERPRINTS, HANDLERS
 from yambs.dependency.handlers.types import DependencyTask
 from yambs.dependency.state import DependencyState
+from yambs.generate.ninja.writer import NinjaWriter
+from yambs.paths import encode_if_changed, sorted_paths, write_if_changed
 
 
-def write_third_party_script(
-    path: Path, commands: List[List[str]] = None
+class ThirdPartyBuild(NamedTuple):
+    """Instructions for building a third-party dependency."""
+
+    # The static library that gets built.
+    output: str
+    commands: List[List[str]]
+
+    # Outputs of other third-party builds that must finish first.
+    after: List[str]
+
+
+def write_third_party_ninja(
+    path: Path, builds: List[ThirdPartyBuild] = None, depth: int = 1
 ) -> None:
     """
-    Create a simple shell script normally containing instructions to build
-    third-party commands.
+    Create a ninja file with edges for building third-party dependencies.
+    Each build runs its own 'ninja', so a pool limits how many run at once.
     """
 
-    if commands is None:
-        commands = []
-
-    with path.open("w") as script_fd:
-        script_fd.write("#!/bin/bash\n\nset -e\n\n")
-
-        # Add build commands.
-        for command in commands:
-            script_fd.write(" ".join(command))
-            script_fd.write(" &\n")
+    if builds is None:
+        builds = []
+
+    writer = NinjaWriter()
+
+    writer.line("pool third_party")
+    writer.line(f"  depth = {depth}")
+    writer.line()
+    writer.line("rule third_party")
+    writer.line("  command = $cmd")
+    writer.line("  description = Building third-party library '$out'.")
+    writer.line("  pool = third_party")
+    writer.line("  restat = 1")
+
+    for build in builds:
+        writer.line()
+        order_only = " || " + " ".join(build.after) if build.after else ""
+        writer.line(f"build {build.output}: third_party{order_only}")
+        writer.line(
+            "  cmd = "
+            + " && ".join(" ".join(x) for x in build.commands).replace(
+                "$", "$$"
+            )
+        )
 
-        script_fd.write('wait\n\ndate > "$1"\n')
+    writer.line()
+    writer.line(
+        "build third_party: phony" + "".join(f" {x.output}" for x in builds)
+    )
 
-    set_exec_flags(path)
+    # Leave the file untouched (it's a build input) if it wouldn't change.
+    write_if_changed(path, writer.getvalue())
 
 
 class DependencyManager:
@@ -61,8 +93,11 @@ class DependencyManager:
         self.static = self.root.joinpath("static")
         self.static.mkdir(parents=True, exist_ok=True)
 
-        # A list of commands to run that should build dependencies.
-        self.build_commands: List[List[str]] = []
+        # Commands to run that should build dependencies (and nested
+        # dependencies) for each dependency.
+        self.builds: List[
+            Tuple[Dependency, List[List[str]], Set[Dependency]]
+        ] = []
 
         # Directories to be treated as additional source directories.
         self.source_dirs: Set[Path] = set()
@@ -83,22 +118,55 @@ class DependencyManager:
     def info(self, logger: LoggerType) -> None:
         """Log some information."""
 
-        if self.build_commands:
-            logger.info("Build commands: %s.", self.build_commands)
+        for build in self.third_party_builds():
+            logger.info("Build commands: %s.", build.commands)
         logger.info("Third-party compile flags: %s.", self.compile_flags)
         logger.info("Third-party link flags: %s.", self.link_flags)
 
-    def save(self, script: Path, logger: LoggerType = None) -> None:
-        """Save state data and create the third-party build script."""
+    def handler_data(self, dep: Dependency) -> DependencyData:
+        """Get handler data for a dependency."""
+        return self.state[str(dep)]["handler"]  # type: ignore
+
+    def third_party_builds(self) -> List[ThirdPartyBuild]:
+        """
+        Get instructions for building dependencies (ordered by the
+        dependency graph).
+        """
+
+        outputs = {
+            dep: str(rel(self.handler_data(dep)["static_library"]))
+            for dep, commands, _ in self.builds
+            if commands
+        }
+
+        return [
+            ThirdPartyBuild(
+                outputs[dep],
+                commands,
+                [outputs[x] for x in sorted(nested, key=str) if x in outputs],
+            )
+            for dep, commands, nested in self.builds
+            if commands
+        ]
 
-        ARBITER.encode(self.state_path, self.state)
+    def save(
+        self, path: Path, logger: LoggerType = None, depth: int = 1
+    ) -> None:
+        """Save state data and create third-party build instructions."""
+
+        encode_if_changed(self.state_path, self.state)
         if logger is not None:
             self.info(logger)
 
-        write_third_party_script(script, commands=self.build_commands)
+        write_third_party_ninja(
+            path, builds=self.third_party_builds(), depth=depth
+        )
 
     def _create_task(self, dep: Dependency) -> DependencyTask:
-        """Create a new task object."""
+        """
+        Create a new task object (with its own outputs, so that tasks can run
+        concurrently).
+        """
 
         dep_data: DependencyData = self.state.setdefault(
             str(dep),
@@ -110,32 +178,111 @@ class DependencyManager:
             self.project_root,
             self.include,
             self.static,
-            self.build_commands,
-            self.source_dirs,
-            self.compile_flags,
-            self.link_flags,
+            [],
+            set(),
+            [],
+            [],
             dep,
             DependencyState(dep_data.setdefault("state", "init")),
             dep_data.setdefault("handler", {}),
             set(),
         )
 
-    def audit(self, dep: Dependency) -> DependencyState:
-        """Interact with a dependency if needed."""
-
-        tasks = [self._create_task(dep)]
-
-        while tasks:
-            task = tasks.pop()
-            state = HANDLERS[dep.kind](task)
-            self.resolved.add(task.dep)
-
-            # Update state.
-            task.data["state"] = str(state.value)
+    def _merge(self, task: DependencyTask) -> None:
+        """Merge the outputs of a completed task."""
+
+        self.builds.append((task.dep, task.build_commands, task.nested))
+        self.source_dirs.update(task.source_dirs)
+        self.compile_flags.extend(task.compile_flags)
+        self.link_flags.extend(task.link_flags)
+
+    def _restore(self, task: DependencyTask) -> bool:
+        """
+        Restore a task's outputs from a previous run if the dependency's
+        fingerprint hasn't changed. Return whether or not outputs were
+        restored.
+        """
+
+        fingerprint = task.data.get("fingerprint")
+        if (
+            fingerprint is None
+            or "outputs" not in task.data
+            or FINGERPRINTS[task.dep.kind](task) != fingerprint
+        ):
+            return False
+
+        outputs = task.data["outputs"]
+        task.build_commands.extend(outputs["build_commands"])
+        task.source_dirs.update(Path(x) for x in outputs["source_dirs"])
+        task.compile_flags.extend(outputs["compile_flags"])
+        task.link_flags.extend(outputs["link_flags"])
+        task.nested.update(Dependency.create(x) for x in outputs["nested"])
+
+        return True
+
+    def _record(self, task: DependencyTask) -> None:
+        """Record a task's fingerprint and outputs (for re-use)."""
+
+        task.data["fingerprint"] = FINGERPRINTS[task.dep.kind](task)
+        task.data["outputs"] = {
+            "build_commands": task.build_commands,
+            "source_dirs": [str(x) for x in sorted_paths(task.source_dirs)],
+            "compile_flags": task.compile_flags,
+            "link_flags": task.link_flags,
+            "nested": [x.asdict() for x in sorted(task.nested, key=str)],
+        }
+
+    def audit_all(
+        self, deps: Iterable[Dependency], jobs: int = 1
+    ) -> Dict[Dependency, DependencyState]:
+        """
+        Interact with dependencies (and their nested dependencies) if needed.
+        Each level of the dependency graph is handled concurrently, but
+        results are always merged in the same order.
+        """
+
+        states: Dict[Dependency, DependencyState] = {}
+
+        level = sorted(set(deps), key=str)
+        while level:
+            tasks = [
+                self._create_task(dep)
+                for dep in level
+                if dep not in self.resolved
+            ]
+
+            # Only run handlers for dependencies that changed.
+            to_run = [task for task in tasks if not self._restore(task)]
+
+            with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+                results = dict(
+                    zip(
+                        (task.dep for task in to_run),
+                        executor.map(
+                            lambda task: HANDLERS[task.dep.kind](task), to_run
+                        ),
+                    )
+                )
+
+            nested: Set[Dependency] = set()
+            for task in tasks:
+                state = results.get(task.dep, task.current)
+                self.resolved.add(task.dep)
+                states[task.dep] = state
+
+                # Update state.
+                task.data["state"] = str(state.value)
+                if task.dep in results:
+                    self._record(task)
+
+                self._merge(task)
+                nested.update(task.nested)
 
             # Handle any nested dependencies.
-            for nested in task.nested:
-                if nested not in self.resolved:
-                    tasks.append(self._create_task(nested))
+            level = sorted(nested - self.resolved, key=str)
+
+        return states
 
-        return state
+    def audit(self, dep: Dependency) -> DependencyState:
+        """Interact with a dependency if needed."""
+        return self.audit_all([dep]).get(dep, DependencyState.INIT)
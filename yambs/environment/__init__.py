@@ -12,6 +12,7 @@ from vcorelib.logging import LoggerMixin
 # internal
 from yambs.config import Config
 from yambs.config.board import Board
+from yambs.paths import sorted_paths
 from yambs.translation import SourceTranslator, get_translator, is_source
 
 SourceAndTranslator = Tuple[Path, SourceTranslator]
@@ -25,7 +26,7 @@ class SourceSets(NamedTuple):
 
     def sources(self) -> Iterator[SourceAndTranslator]:
         """Iterate over sources and their source translator."""
-        for source in self.regular:
+        for source in sorted_paths(self.regular):
             yield source, get_translator(source)
 
     def link_sources(self) -> Iterator[SourceAndTranslator]:
@@ -73,7 +74,7 @@ class BuildEnvironment(LoggerMixin):
         # We can't use 'global sources' for this because it uses build paths
         # instead of source-tree paths.
         for sources in self.by_board.values():
-            for source in sources.regular | sources.apps:
+            for source in sorted_paths(sources.regular | sources.apps):
                 # Try to remove board-specific namespacing. This still might
                 # not point to a real file because some of these sources may
                 # be generated.
@@ -92,7 +93,7 @@ class BuildEnvironment(LoggerMixin):
                     yield source
                     visited.add(source)
 
-        yield from self.first_party_headers
+        yield from sorted_paths(self.first_party_headers)
 
     def set_board_sources(
         self, board: Board, regular: Set[Path], apps: Set[Path]
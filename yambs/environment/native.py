@@ -3,58 +3,80 @@ A module implementing a native-build environment.
 """
 
 # built-in
+from collections import defaultdict
 from os import linesep
 from pathlib import Path
-from typing import Any, Dict, Optional, Set, TextIO
+from typing import Any, Dict, List, Optional, Set
 
 # third-party
-from vcorelib.io import ARBITER
 from vcorelib.logging import LoggerMixin
 
 # internal
-from yambs.aggregation import collect_files, populate_sources, sources_headers
+from yambs.aggregation import (
+    BySuffixPaths,
+    SourceRoot,
+    collect_roots,
+    populate_sources,
+    sources_headers,
+)
+from yambs.aggregation.snapshot import SourceSnapshot
 from yambs.config.native import Native
 from yambs.dependency.manager import DependencyManager
 from yambs.generate.common import APP_ROOT, get_jinja, render_template
-from yambs.generate.ninja import variant_phony, write_continuation, write_link
+from yambs.generate.ninja import variant_phony, write_link, write_uf2_batch
 from yambs.generate.ninja.format import render_format
+from yambs.generate.ninja.writer import NinjaWriter
 from yambs.generate.variants import generate as generate_variants
-from yambs.paths import combine_if_not_absolute, resolve_build_dir
+from yambs.paths import (
+    combine_if_not_absolute,
+    encode_if_changed,
+    resolve_build_dir,
+    sorted_paths,
+    write_if_changed,
+)
 from yambs.translation import BUILD_DIR_PATH, get_translator
 
 
 class NativeBuildEnvironment(LoggerMixin):
     """A class implementing a native-build environment."""
 
-    def __init__(self, config: Native) -> None:
+    def __init__(self, config: Native, jobs: int = 1) -> None:
         """Initialize this instance."""
 
         super().__init__()
 
         self.config = config
+        self.jobs = jobs
 
         self.dependency_manager = DependencyManager(
             self.config.third_party_root, self.config.root
         )
 
-        # Collect sources.
-        self.sources = collect_files(config.src_root)
+        # Sources are collected when generating (re-using directory listings
+        # from the previous run where possible).
+        self.snapshot = SourceSnapshot(
+            self.config.ninja_root.joinpath("source_snapshot.json")
+        )
+        self.sources: BySuffixPaths = defaultdict(set)
         self.apps: Set[Path] = set()
         self.regular: Set[Path] = set()
         self.third_party: Set[Path] = set()
 
         self.jinja = get_jinja()
 
+        # Keep track of how many generated files actually get written.
+        self.written = 0
+
     def render(self, root: Path, name: str) -> None:
         """Render a template."""
 
         with self.log_time("Render '%s'", root.joinpath(name)):
-            render_template(
+            self.written += render_template(
                 self.jinja, root, f"native_{name}", self.config.data, out=name
             )
 
     def write_compile_line(
-        self, stream: TextIO, path: Path, wasm: bool = False
+        self, writer: NinjaWriter, path: Path, wasm: bool = False
     ) -> Path:
         """Write a single source-compile line."""
 
@@ -63,12 +85,14 @@ class NativeBuildEnvironment(LoggerMixin):
 
         out = translator.output(from_src)
 
-        translator.write(stream, out, f"$src_dir/{from_src}", wasm=wasm)
+        writer.write(
+            translator.statements(out, f"$src_dir/{from_src}", wasm=wasm)
+        )
 
         return out
 
     def write_third_party_line(
-        self, stream: TextIO, path: Path, wasm: bool = False
+        self, writer: NinjaWriter, path: Path, wasm: bool = False
     ) -> Optional[Path]:
         """Write a single source-compile line for a third-party source."""
 
@@ -87,52 +111,57 @@ class NativeBuildEnvironment(LoggerMixin):
                 Path("$build_dir", "third-party", rel_part)
             )
 
-            translator.write(
-                stream, out, f"$third_party_dir/{rel_part}", wasm=wasm
+            writer.write(
+                translator.statements(
+                    out, f"$third_party_dir/{rel_part}", wasm=wasm
+                )
             )
 
         return out
 
     def write_source_rules(
-        self, stream: TextIO, wasm: bool = False
-    ) -> Set[Path]:
-        """Write source rules."""
+        self, writer: NinjaWriter, wasm: bool = False
+    ) -> List[Path]:
+        """Write source rules (return outputs in a stable order)."""
 
         result = {
-            self.write_compile_line(stream, path, wasm=wasm)
-            for path in self.regular
+            self.write_compile_line(writer, path, wasm=wasm)
+            for path in sorted_paths(self.regular)
         }
 
         # Add third-party sources.
-        for path in self.third_party:
-            path_result = self.write_third_party_line(stream, path, wasm=wasm)
+        for path in sorted_paths(self.third_party):
+            path_result = self.write_third_party_line(writer, path, wasm=wasm)
             if path_result is not None:
                 result.add(path_result)
 
-        return result
+        return sorted_paths(result)
+
+    def static_library(self, suffix: str = ".o") -> Path:
+        """Get the static library for objects with a given suffix."""
+
+        name = str(self.config.project)
+        if suffix != ".o":
+            name += suffix
+        return BUILD_DIR_PATH.joinpath(f"{name}.a")
 
     def write_static_library_rule(
-        self, stream: TextIO, outputs: Set[Path]
+        self, writer: NinjaWriter, outputs: List[Path], suffix: str = ".o"
     ) -> Path:
         """Create a rule for a static library output."""
 
-        lib = BUILD_DIR_PATH.joinpath(f"{self.config.project}.a")
-        line = f"build {lib}: ar "
-        offset = " " * len(line)
-
-        list_outputs = list(outputs)
-        stream.write(line + str(list_outputs[0]))
-        for file in list_outputs[1:]:
-            write_continuation(stream, offset)
-            stream.write(str(file))
-
-        stream.write(linesep + linesep)
-
+        lib = self.static_library(suffix)
+        writer.build(
+            str(lib),
+            "ar",
+            (writer.path(file, suffix) for file in outputs),
+            suffix=linesep + linesep,
+        )
         return lib
 
     def _write_app_phony_targets(
         self,
-        stream: TextIO,
+        writer: NinjaWriter,
         elfs: Dict[Path, Path],
         uf2_family: str = None,
         wasm: bool = False,
@@ -141,12 +170,12 @@ class NativeBuildEnvironment(LoggerMixin):
 
         elfs_list = list(elfs.values())
         if elfs_list:
-            variant_phony(stream, elfs_list, uf2_family=uf2_family, wasm=wasm)
+            variant_phony(writer, elfs_list, uf2_family=uf2_family, wasm=wasm)
 
     def write_app_rules(
         self,
-        stream: TextIO,
-        outputs: Set[Path],
+        writer: NinjaWriter,
+        outputs: List[Path],
         uf2_family: str = None,
         wasm: bool = False,
     ) -> Dict[Path, Path]:
@@ -154,45 +183,58 @@ class NativeBuildEnvironment(LoggerMixin):
 
         elfs: Dict[Path, Path] = {}
 
+        # Optionally link applications against static libraries (so that
+        # link lines don't list every object).
+        archives: Dict[str, Path] = {}
+        if outputs and self.config.data["link_library"]:
+            archives[".o"] = self.static_library()
+            if wasm:
+                archives[".wasm"] = self.static_library(".wasm")
+
+        # Optionally convert all UF2 images with a single edge.
+        uf2_batch = bool(uf2_family) and self.config.data["uf2_batch"]
+        hexs: List[Path] = []
+
         # Create rules for linked executables.
-        for path in self.apps:
-            out = self.write_compile_line(stream, path, wasm=wasm)
+        for path in sorted_paths(self.apps):
+            out = self.write_compile_line(writer, path, wasm=wasm)
 
             from_src = path.relative_to(self.config.src_root)
             elf = BUILD_DIR_PATH.joinpath(from_src.with_suffix(".elf"))
             elfs[path] = elf
 
-            write_link(stream, elf, out, outputs, wasm=wasm)
+            write_link(writer, elf, out, outputs, wasm=wasm, archives=archives)
 
             # Write rules for other kinds of outputs.
             for output in ["bin", "hex", "dump"]:
-                stream.write(
+                writer.line(
                     f"build {elf.with_suffix('.' + output)}: {output} {elf}"
                 )
-                stream.write(linesep)
-
-            if uf2_family:
-                stream.write(
-                    (
-                        f"build {elf.with_suffix('.uf2')}: "
-                        f"uf2 {elf.with_suffix('.hex')}"
-                    )
+
+            if uf2_batch:
+                hexs.append(elf.with_suffix(".hex"))
+            elif uf2_family:
+                writer.line(
+                    f"build {elf.with_suffix('.uf2')}: "
+                    f"uf2 {elf.with_suffix('.hex')}"
                 )
-                stream.write(linesep)
 
-            stream.write(linesep)
+            writer.line()
+
+        if hexs:
+            write_uf2_batch(writer, hexs)
 
         # Add a phony target for creating a static library.
         if outputs:
-            stream.write(
-                "build ${variant}_lib: phony "
-                + str(self.write_static_library_rule(stream, outputs))
-                + linesep
-                + linesep
-            )
+            lib = self.write_static_library_rule(writer, outputs)
+            writer.line(f"build ${{variant}}_lib: phony {lib}")
+            writer.line()
+
+            if ".wasm" in archives:
+                self.write_static_library_rule(writer, outputs, ".wasm")
 
         self._write_app_phony_targets(
-            stream, elfs, uf2_family=uf2_family, wasm=wasm
+            writer, elfs, uf2_family=uf2_family, wasm=wasm
         )
 
         return elfs
@@ -204,7 +246,7 @@ class NativeBuildEnvironment(LoggerMixin):
         with self.log_time("Write '%s'", path):
             data: Dict[str, Any] = {}
 
-            for app in self.apps:
+            for app in sorted_paths(self.apps):
                 name = app.with_suffix("").name
                 assert (
                     name not in data
@@ -222,7 +264,7 @@ class NativeBuildEnvironment(LoggerMixin):
                     },
                 }
 
-            ARBITER.encode(
+            self.written += encode_if_changed(
                 path,
                 {
                     "all": data,
@@ -230,12 +272,13 @@ class NativeBuildEnvironment(LoggerMixin):
                 },
             )
 
-    def _handle_extra_source_dirs(self) -> None:
+    def _handle_extra_source_dirs(self) -> List[SourceRoot]:
         """Handle additional source directories (belonging to dependencies)."""
 
         # Recurse directories from the dependency manager.
         paths_recurse = [
-            (path, True) for path in self.dependency_manager.source_dirs
+            (path, True)
+            for path in sorted_paths(self.dependency_manager.source_dirs)
         ]
 
         # Don't recurse directories provided by the configuration.
@@ -246,8 +289,23 @@ class NativeBuildEnvironment(LoggerMixin):
             ]
         )
 
-        for path, recurse in paths_recurse:
-            collect_files(path, files=self.sources, recurse=recurse)
+        return paths_recurse
+
+    def _collect_sources(self, sources_only: bool = False) -> None:
+        """Collect sources from the main tree and any additional roots."""
+
+        roots: List[SourceRoot] = [(self.config.src_root, True)]
+        if not sources_only:
+            roots.extend(self._handle_extra_source_dirs())
+
+        with self.log_time("Collect sources (%d roots)", len(roots)):
+            collect_roots(
+                roots,
+                files=self.sources,
+                snapshot=self.snapshot,
+                prune=set(self.config.data["prune_dirs"]),
+                jobs=self.jobs,
+            )
 
     def generate(self, sources_only: bool = False) -> None:
         """Generate ninja files."""
@@ -256,12 +314,15 @@ class NativeBuildEnvironment(LoggerMixin):
 
         if not sources_only:
             # Audit dependencies.
-            for dep in self.config.dependencies:
-                self.dependency_manager.audit(dep)
+            self.dependency_manager.audit_all(
+                self.config.dependencies, jobs=self.jobs
+            )
 
-            # Create build script.
+            # Create build instructions.
             self.dependency_manager.save(
-                self.config.third_party_script, logger=self.logger
+                self.config.third_party_ninja,
+                logger=self.logger,
+                depth=self.config.data["third_party_jobs"],
             )
 
             # Handle compile and link flags generated by the third-party pass.
@@ -272,7 +333,7 @@ class NativeBuildEnvironment(LoggerMixin):
                 self.dependency_manager.link_flags
             )
 
-            self._handle_extra_source_dirs()
+            self._collect_sources()
             populate_sources(
                 self.sources,
                 self.config.src_root,
@@ -282,7 +343,7 @@ class NativeBuildEnvironment(LoggerMixin):
             )
 
             # Render templates.
-            generate_variants(
+            self.written += generate_variants(
                 self.jinja,
                 self.config,
                 self.config.data["cflag_groups"],
@@ -291,35 +352,43 @@ class NativeBuildEnvironment(LoggerMixin):
             self.render(self.config.root, "build.ninja")
             for template in ["all", "rules"]:
                 self.render(self.config.ninja_root, f"{template}.ninja")
+        else:
+            self._collect_sources(sources_only=True)
 
         # Render sources file.
         path = self.config.ninja_root.joinpath("sources.ninja")
         with self.log_time("Write '%s'", path):
-            with path.open("w") as path_fd:
-                outputs = self.write_source_rules(path_fd, wasm=wasm)
+            writer = NinjaWriter()
+            outputs = self.write_source_rules(writer, wasm=wasm)
+            self.written += write_if_changed(path, writer.getvalue())
 
         # Render apps file.
         path = self.config.ninja_root.joinpath("apps.ninja")
         with self.log_time("Write '%s'", path):
-            with path.open("w") as path_fd:
-                elfs = self.write_app_rules(
-                    path_fd,
-                    outputs,
-                    self.config.data.get("uf2_family"),
-                    wasm=wasm,
-                )
+            writer = NinjaWriter()
+            elfs = self.write_app_rules(
+                writer,
+                outputs,
+                self.config.data.get("uf2_family"),
+                wasm=wasm,
+            )
+            self.written += write_if_changed(path, writer.getvalue())
 
         # Render format file.
-        render_format(
+        self.written += render_format(
             self.config,
-            {
+            sorted_paths(
                 x
                 for x in sources_headers(self.sources)
                 if self.config.src_root in x.parents
-            },
+            ),
             root=self.config.root,
             suffix=self.config.data["variants"]["clang"]["suffix"],
         )
 
         # Render application manifest.
         self._render_app_manifest(elfs)
+
+        self.snapshot.save(logger=self.logger)
+
+        self.logger.info("Wrote %d generated file(s).", self.written)
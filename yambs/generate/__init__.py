@@ -6,7 +6,6 @@ A module for generating templated outputs.
 from typing import Any, Dict
 
 # third-party
-from vcorelib.io import ARBITER
 from vcorelib.paths import resource
 
 # internal
@@ -18,12 +17,14 @@ from yambs.generate.chips import generate as generate_chips
 from yambs.generate.common import get_jinja, render_template
 from yambs.generate.ninja.format import render_format
 from yambs.generate.toolchains import generate as generate_toolchains
+from yambs.paths import encode_if_changed
 
 
-def create_board_apps(env: BuildEnvironment) -> None:
+def create_board_apps(env: BuildEnvironment) -> bool:
     """
     Generate JSON metadata to give other tools a simple lookup to application
-    sources (e.g. for loading or deploying).
+    sources (e.g. for loading or deploying). Return whether or not the file
+    was written.
     """
 
     board_apps: Dict[str, Any] = {}
@@ -36,7 +37,7 @@ def create_board_apps(env: BuildEnvironment) -> None:
             for short, path in board.apps.items()
         }
 
-    ARBITER.encode(
+    return encode_if_changed(
         env.config.ninja_root.joinpath("board_apps.json"),
         board_apps,
     )
@@ -50,10 +51,14 @@ def generate(env: BuildEnvironment, sources_only: bool = False) -> None:
 
     jinja = get_jinja()
 
+    written = 0
+
     if not sources_only:
         # Render the top-level configuration. This is the only file that's
         # generated into the root directory.
-        render_template(jinja, env.config.root, "build.ninja", env.config.data)
+        written += render_template(
+            jinja, env.config.root, "build.ninja", env.config.data
+        )
 
         # Generate all other files.
         for gen in [
@@ -61,17 +66,19 @@ def generate(env: BuildEnvironment, sources_only: bool = False) -> None:
             generate_toolchains,
             generate_architectures,
         ]:
-            gen(jinja, env.config)
+            written += gen(jinja, env.config)
 
         # Render the board manifest and rules file.
         for template in ["all.ninja", "rules.ninja"]:
-            render_template(
+            written += render_template(
                 jinja, env.config.ninja_root, template, env.config.data
             )
 
-    generate_boards(jinja, env, sources_only=sources_only)
+    written += generate_boards(jinja, env, sources_only=sources_only)
 
-    create_board_apps(env)
+    written += create_board_apps(env)
 
     # Create format configuration.
-    render_format(env.config, env.first_party_sources_headers())
+    written += render_format(env.config, env.first_party_sources_headers())
+
+    env.logger.info("Wrote %d generated file(s).", written)
@@ -10,16 +10,23 @@ from yambs.config.common import CommonConfig
 from yambs.generate.common import render_template
 
 
-def generate(jinja: Environment, config: CommonConfig) -> None:
-    """Generate architecture-related ninja files."""
+def generate(jinja: Environment, config: CommonConfig) -> int:
+    """
+    Generate architecture-related ninja files (return the number of files
+    written).
+    """
+
+    written = 0
 
     for name, data in config.data["architectures"].items():
         architectures_root = config.ninja_root.joinpath("architectures", name)
         architectures_root.mkdir(parents=True, exist_ok=True)
 
-        render_template(
+        written += render_template(
             jinja,
             architectures_root,
             "architecture.ninja",
             data,
         )
+
+    return written
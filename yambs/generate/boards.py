@@ -6,7 +6,7 @@ A module for generating board-related files.
 from logging import getLogger
 from os import linesep
 from pathlib import Path
-from typing import Any, Dict, Set, TextIO
+from typing import Any, Dict, Set
 
 # third-party
 from jinja2 import Environment
@@ -17,13 +17,15 @@ from yambs.config.board import Board
 from yambs.environment import BuildEnvironment, SourceSets
 from yambs.generate.common import APP_ROOT, render_template
 from yambs.generate.ninja import write_link_lines, write_source_line
+from yambs.generate.ninja.writer import NinjaWriter
+from yambs.paths import sorted_paths, write_if_changed
 from yambs.translation import is_header, is_source
 
 LOG = getLogger(__name__)
 
 
 def add_dir(
-    stream: TextIO,
+    writer: NinjaWriter,
     paths: Set[Path],
     path: Path,
     comment: str,
@@ -40,13 +42,13 @@ def add_dir(
 
     if path.is_dir():
         if comment:
-            stream.write(linesep + f"# {comment}." + linesep)
+            writer.write(linesep + f"# {comment}." + linesep)
 
-        for item in path.iterdir():
+        for item in sorted_paths(path.iterdir()):
             # Recurse into other directories.
             if item.is_dir():
                 add_dir(
-                    stream,
+                    writer,
                     paths,
                     item,
                     "",
@@ -60,7 +62,7 @@ def add_dir(
             if translator is not None:
                 paths.add(
                     write_source_line(
-                        stream,
+                        writer,
                         item,
                         base,
                         current_sources,
@@ -90,7 +92,7 @@ def create_paths_dict(root: Path, board: Board) -> Dict[str, Any]:
 
 
 def write_sources(
-    stream: TextIO,
+    writer: NinjaWriter,
     board: Board,
     src_root: Path,
     env: BuildEnvironment,
@@ -106,7 +108,7 @@ def write_sources(
     for kind, path in create_paths_dict(src_root, board).items():
         headers.update(
             add_dir(
-                stream,
+                writer,
                 all_srcs,
                 path,
                 f"{kind} sources",
@@ -122,7 +124,7 @@ def write_sources(
     ):
         # Don't keep track of external headers.
         add_dir(
-            stream,
+            writer,
             all_srcs,
             src_root.joinpath("third-party", extra),
             f"Extra sources ({extra})",
@@ -138,7 +140,7 @@ def write_sources(
     ).items():
         headers.update(
             add_dir(
-                stream,
+                writer,
                 app_srcs,
                 path,
                 f"{kind} application sources",
@@ -160,24 +162,41 @@ def write_sources(
 
 def generate(
     jinja: Environment, env: BuildEnvironment, sources_only: bool = False
-) -> None:
-    """Generate board-related ninja files."""
+) -> int:
+    """
+    Generate board-related ninja files (return the number of files
+    written).
+    """
+
+    written = 0
 
     for board, raw_data in env.config.boards():
         board_root = env.config.ninja_root.joinpath("boards", board.name)
         board_root.mkdir(parents=True, exist_ok=True)
 
         if not sources_only:
-            render_template(jinja, board_root, "board.ninja", raw_data)
+            written += render_template(
+                jinja, board_root, "board.ninja", raw_data
+            )
 
         src_root = rel(env.config.src_root)
 
         # Perform source-file discovery.
-        with board_root.joinpath("sources.ninja").open("w") as sources_fd:
-            with board_root.joinpath("apps.ninja").open("w") as apps_fd:
-                write_link_lines(
-                    apps_fd,
-                    src_root,
-                    board,
-                    write_sources(sources_fd, board, src_root, env),
-                )
+        sources = NinjaWriter()
+        apps = NinjaWriter()
+        write_link_lines(
+            apps,
+            src_root,
+            board,
+            write_sources(sources, board, src_root, env),
+            uf2_batch=env.config.data["uf2_batch"],
+        )
+
+        written += write_if_changed(
+            board_root.joinpath("sources.ninja"), sources.getvalue()
+        )
+        written += write_if_changed(
+            board_root.joinpath("apps.ninja"), apps.getvalue()
+        )
+
+    return written
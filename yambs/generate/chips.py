@@ -10,23 +10,30 @@ from yambs.config.common import CommonConfig
 from yambs.generate.common import render_template
 
 
-def generate(jinja: Environment, config: CommonConfig) -> None:
-    """Generate chip-related ninja files."""
+def generate(jinja: Environment, config: CommonConfig) -> int:
+    """
+    Generate chip-related ninja files (return the number of files
+    written).
+    """
+
+    written = 0
 
     for name, data in config.data["chips"].items():
         chips_root = config.ninja_root.joinpath("chips", name)
         chips_root.mkdir(parents=True, exist_ok=True)
 
         # Render chip files and linker scripts.
-        render_template(
+        written += render_template(
             jinja,
             chips_root,
             "chip.ninja",
             data,
         )
-        render_template(
+        written += render_template(
             jinja,
             chips_root,
             "chip.ld",
             data["linker"],
         )
+
+    return written
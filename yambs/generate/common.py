@@ -3,22 +3,48 @@ A module containing common generation utilities.
 """
 
 # built-in
+from functools import lru_cache
 from os import linesep
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 # third-party
 from datazen.templates import environment
-from jinja2 import Environment, FileSystemLoader
-from vcorelib import DEFAULT_ENCODING
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+)
 from vcorelib.paths import resource
 
 # internal
-from yambs import PKG_NAME
+from yambs import PKG_NAME, VERSION
+from yambs.paths import user_cache_dir, write_if_changed
 
 APP_ROOT = "apps"
 
 
+def bytecode_cache() -> Optional[BytecodeCache]:
+    """
+    Get a cache for compiled templates (entries are invalidated when a
+    template's source changes). Return None if the cache directory isn't
+    usable.
+    """
+
+    # Compiled templates also depend on environment settings, so keep a
+    # separate cache for each package version.
+    path = user_cache_dir("jinja", VERSION)
+
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+
+    return FileSystemBytecodeCache(str(path))
+
+
+@lru_cache(maxsize=None)
 def get_jinja() -> Environment:
     """Get a jinja environment for package templates."""
 
@@ -26,7 +52,8 @@ def get_jinja() -> Environment:
     assert templates_dir is not None
 
     return environment(
-        loader=FileSystemLoader([templates_dir], followlinks=True)
+        loader=FileSystemLoader([templates_dir], followlinks=True),
+        bytecode_cache=bytecode_cache(),
     )
 
 
@@ -36,12 +63,16 @@ def render_template(
     name: str,
     data: Dict[str, Any],
     out: str = None,
-) -> None:
-    """Render a single template."""
+) -> bool:
+    """
+    Render a single template. Return whether or not the output file was
+    written (it's left untouched if its contents wouldn't change).
+    """
 
     if out is None:
         out = name
 
-    with root.joinpath(out).open("w", encoding=DEFAULT_ENCODING) as path_fd:
-        path_fd.write(jinja.get_template(f"{name}.j2").render(data))
-        path_fd.write(linesep)
+    return write_if_changed(
+        root.joinpath(out),
+        jinja.get_template(f"{name}.j2").render(data) + linesep,
+    )
@@ -5,16 +5,18 @@ A module for working with ninja syntax.
 # built-in
 from os import linesep
 from pathlib import Path
-from typing import Set, TextIO
+from typing import Dict, Iterable, List, Set
 
 # internal
 from yambs.config.board import Board
 from yambs.environment import SourceSets
+from yambs.generate.ninja.writer import CONTINUATION, NinjaWriter
+from yambs.paths import sorted_paths
 from yambs.translation import BUILD_DIR_VAR, SourceTranslator
 
 
 def write_source_line(
-    stream: TextIO,
+    writer: NinjaWriter,
     source: Path,
     base: Path,
     current_sources: Set[Path],
@@ -34,33 +36,41 @@ def write_source_line(
     if build_loc not in current_sources:
         current_sources.add(build_loc)
 
-        stream.write(
-            (
-                f"build {translator.output(dest.relative_to(base))}: "
-                f"{translator.rule} $src_dir/{source.relative_to(base)}"
-            )
+        line = (
+            f"build {translator.output(dest.relative_to(base))}: "
+            f"{translator.rule} $src_dir/{source.relative_to(base)}"
         )
 
         # Any regular source file depends on all of the boards generated
         # depencencies.
         if not translator.generated_header:
-            stream.write(" || ${board}_generated")
+            line += " || ${board}_generated"
 
-        stream.write(linesep)
+        writer.line(line)
 
     return dest
 
 
-def write_continuation(stream: TextIO, offset: str) -> None:
-    """Write a line continuation."""
-    stream.write(" $" + linesep + offset)
+def link_objects(base: Path, sources: SourceSets) -> List[str]:
+    """Get the objects that every application for a board links."""
+
+    return [
+        str(trans.output(src.relative_to(base)))
+        for src, trans in sources.link_sources()
+    ]
 
 
 def write_link_line(
-    stream: TextIO, source: Path, base: Path, board: Board, sources: SourceSets
+    writer: NinjaWriter,
+    source: Path,
+    base: Path,
+    board: Board,
+    objects: List[str],
+    uf2: bool = True,
 ) -> None:
     """
-    Write a ninja configuration line for an application requiring linking.
+    Write a ninja configuration line for an application requiring linking
+    (and, optionally, converting to UF2).
     """
 
     source = source.relative_to(base)
@@ -71,33 +81,24 @@ def write_link_line(
     }
 
     elf = f"{BUILD_DIR_VAR}/{by_suffix['elf']}"
-    line = f"build {elf}: link "
-    offset = " " * len(line)
-    stream.write(line + f"{BUILD_DIR_VAR}/{by_suffix['o']}")
-
-    for src, trans in sources.link_sources():
-        write_continuation(stream, offset)
-        stream.write(str(trans.output(src.relative_to(base))))
-    stream.write(linesep)
+    writer.build(elf, "link", [f"{BUILD_DIR_VAR}/{by_suffix['o']}", *objects])
 
     # Add lines for creating binaries.
-    stream.write(
-        f"build {BUILD_DIR_VAR}/{by_suffix['bin']}: bin {elf}" + linesep
-    )
+    writer.line(f"build {BUILD_DIR_VAR}/{by_suffix['bin']}: bin {elf}")
 
     # Add an objdump target.
-    stream.write(
-        f"build {BUILD_DIR_VAR}/{by_suffix['dump']}: dump {elf}" + linesep
-    )
+    writer.line(f"build {BUILD_DIR_VAR}/{by_suffix['dump']}: dump {elf}")
 
     # Add an hex target.
     hex_path = f"{BUILD_DIR_VAR}/{by_suffix['hex']}"
-    stream.write(f"build {hex_path}: hex {elf}" + linesep)
+    writer.line(f"build {hex_path}: hex {elf}")
 
     # Add a uf2 target.
-    stream.write(f"build {BUILD_DIR_VAR}/{by_suffix['uf2']}: uf2 {hex_path}")
-
-    stream.write(linesep + linesep)
+    if uf2:
+        writer.line(
+            f"build {BUILD_DIR_VAR}/{by_suffix['uf2']}: uf2 {hex_path}"
+        )
+    writer.line()
 
     # Add this application to the board's data structure.
     out = by_suffix["elf"].with_suffix("")
@@ -105,45 +106,82 @@ def write_link_line(
 
 
 def write_generated_phony(
-    stream: TextIO, sources: SourceSets, src_root: Path
+    writer: NinjaWriter, sources: SourceSets, src_root: Path
 ) -> None:
     """Write generated-file phony target."""
 
     # Write generated-file phony target.
-    stream.write("# A target to generate additional headers." + linesep)
-    phony_line = "build ${board}_generated: phony"
-    offset = " " * (len(phony_line) + 1)
-
-    stream.write(phony_line)
+    writer.line("# A target to generate additional headers.")
 
-    implicit = list(sources.implicit_sources())
+    implicit = [
+        str(trans.output(src.relative_to(src_root)))
+        for src, trans in sources.implicit_sources()
+    ]
     if implicit:
-        src, trans = implicit[0]
-        stream.write(f" {trans.output(src.relative_to(src_root))}")
-        for src, trans in implicit[1:]:
-            write_continuation(stream, offset)
-            stream.write(str(trans.output(src.relative_to(src_root))))
-    stream.write(linesep + linesep)
+        writer.build(
+            "${board}_generated", "phony", implicit, suffix=linesep + linesep
+        )
+    else:
+        writer.line("build ${board}_generated: phony")
+        writer.line()
+
+
+def write_uf2_batch(writer: NinjaWriter, hexs: List[Path]) -> None:
+    """
+    Write a single build statement that converts many HEX images to UF2
+    (next to themselves).
+    """
+
+    writer.aligned(
+        "build ", (writer.path(x, ".uf2") for x in hexs), suffix=CONTINUATION
+    )
+    writer.aligned(
+        "  : uf2_batch ",
+        (writer.path(x) for x in hexs),
+        suffix=linesep + linesep,
+    )
 
 
 def write_link_lines(
-    stream: TextIO, src_root: Path, board: Board, sources: SourceSets
+    writer: NinjaWriter,
+    src_root: Path,
+    board: Board,
+    sources: SourceSets,
+    uf2_batch: bool = False,
 ) -> None:
     """Write the application manifest and phony targets."""
 
+    # Every application links the same set of objects.
+    objects = link_objects(src_root, sources)
+
     # Write the application manifest.
-    for app_src in sources.apps:
-        write_link_line(stream, app_src, src_root, board, sources)
+    apps = sorted_paths(sources.apps)
+    for app_src in apps:
+        write_link_line(
+            writer, app_src, src_root, board, objects, uf2=not uf2_batch
+        )
+
+    # Convert all of the board's applications to UF2 at once.
+    if uf2_batch and apps:
+        write_uf2_batch(
+            writer,
+            [
+                Path(
+                    BUILD_DIR_VAR, x.relative_to(src_root).with_suffix(".hex")
+                )
+                for x in apps
+            ],
+        )
 
-    write_generated_phony(stream, sources, src_root)
+    write_generated_phony(writer, sources, src_root)
 
     # Write the phony target.
-    stream.write("# A target to build all applications." + linesep)
-    write_phony(stream, sources.apps, src_root, board.name)
+    writer.line("# A target to build all applications.")
+    write_phony(writer, sources.apps, src_root, board.name)
 
 
 def write_phony(
-    stream: TextIO, app_srcs: Set[Path], base: Path, board: str
+    writer: NinjaWriter, app_srcs: Set[Path], base: Path, board: str
 ) -> None:
     """Write the phony target."""
 
@@ -155,30 +193,27 @@ def write_phony(
     ]
 
     if app_srcs:
+        srcs = [src.relative_to(base) for src in sorted_paths(app_srcs)]
         for phony, suffix in phonies:
-            srcs = list(app_srcs)
-            first = srcs[0].relative_to(base)
-            srcs = srcs[1:]
-
-            line = f"build {board}_{phony}: phony "
-            offset = " " * len(line)
-            stream.write(line + f"{BUILD_DIR_VAR}/{first.with_suffix(suffix)}")
-            for src in srcs:
-                write_continuation(stream, offset)
-                src = src.relative_to(base)
-                stream.write(f"{BUILD_DIR_VAR}/{src.with_suffix(suffix)}")
-
-            stream.write(linesep)
+            writer.build(
+                f"{board}_{phony}",
+                "phony",
+                (f"{BUILD_DIR_VAR}/{src.with_suffix(suffix)}" for src in srcs),
+            )
 
 
 def write_link(
-    stream: TextIO,
+    writer: NinjaWriter,
     output: Path,
     entry_object: Path,
-    outputs: Set[Path],
+    outputs: Iterable[Path],
     wasm: bool = False,
+    archives: Dict[str, Path] = None,
 ) -> None:
-    """Write a 'link' rule."""
+    """
+    Write a 'link' rule. If static libraries are provided (by object suffix),
+    link those (in their entirety) instead of individual objects.
+    """
 
     pairs = [(output.suffix, entry_object.suffix, "link")]
 
@@ -186,36 +221,34 @@ def write_link(
         pairs.append((".html", ".wasm", "link_no_map"))
 
     for out_suffix, entry_suffx, rule in pairs:
-        line = f"build {output.with_suffix(out_suffix)}: {rule} "
-        offset = " " * len(line)
-
-        stream.write(line + str(entry_object.with_suffix(entry_suffx)))
-
-        for file in outputs:
-            write_continuation(stream, offset)
-            stream.write(str(file.with_suffix(entry_suffx)))
-
-        # Executables can't be linked until third-party dependencies are
-        # actually built.
-        stream.write(" | ${variant}_third_party" + linesep + linesep)
+        inputs = [writer.path(entry_object, entry_suffx)]
+        if archives:
+            rule += "_whole"
+            inputs.append(writer.path(archives[entry_suffx]))
+        else:
+            inputs.extend(writer.path(file, entry_suffx) for file in outputs)
+
+        writer.build(
+            writer.path(output, out_suffix),
+            rule,
+            inputs,
+            # Executables can't be linked until third-party dependencies are
+            # actually built.
+            suffix=" | ${variant}_third_party" + linesep + linesep,
+        )
 
 
 def variant_phony(
-    stream: TextIO,
+    writer: NinjaWriter,
     elfs_list: list[Path],
     uf2_family: str = None,
     wasm: bool = False,
 ):
     """Write variant-specific phony targets."""
 
-    line = "build ${variant}_apps: phony "
-    offset = " " * len(line)
-
-    stream.write(line + str(elfs_list[0]))
-    for elf in elfs_list[1:]:
-        write_continuation(stream, offset)
-        stream.write(str(elf))
-    stream.write(linesep)
+    writer.build(
+        "${variant}_apps", "phony", (writer.path(x) for x in elfs_list)
+    )
 
     suffixes = []
     if wasm:
@@ -224,13 +257,8 @@ def variant_phony(
         suffixes.append("uf2")
 
     for suffix in suffixes:
-        line = "build ${variant}_" + f"{suffix}s: phony "
-        offset = " " * len(line)
-
-        outputs = [x.with_suffix("." + suffix) for x in elfs_list]
-
-        stream.write(line + str(outputs[0]))
-        for elf in outputs[1:]:
-            write_continuation(stream, offset)
-            stream.write(str(elf))
-        stream.write(linesep)
+        writer.build(
+            "${variant}_" + f"{suffix}s",
+            "phony",
+            (writer.path(x, "." + suffix) for x in elfs_list),
+        )
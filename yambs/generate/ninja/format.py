@@ -4,17 +4,16 @@ A module for writing formatting-related ninja build rules.
 
 # built-in
 from itertools import batched
-from os import linesep
 from pathlib import Path
-from typing import Iterable, TextIO
+from typing import Iterable
 
 # third-party
-from vcorelib import DEFAULT_ENCODING
 from vcorelib.paths import rel
 
 # internal
 from yambs.config.common import CommonConfig
-from yambs.generate.ninja import write_continuation
+from yambs.generate.ninja.writer import NinjaWriter
+from yambs.paths import write_if_changed
 
 
 def render_format(
@@ -22,38 +21,32 @@ def render_format(
     paths: Iterable[Path],
     root: Path = None,
     suffix: str = "",
-) -> None:
-    """Render the ninja source for formatting files."""
+) -> bool:
+    """
+    Render the ninja source for formatting files. Return whether or not the
+    file was written.
+    """
 
-    with config.ninja_root.joinpath("format.ninja").open(
-        "w", encoding=DEFAULT_ENCODING
-    ) as path_fd:
-        write_format_target(path_fd, paths, suffix, root)
+    writer = NinjaWriter()
+    write_format_target(writer, paths, suffix, root)
+    return write_if_changed(
+        config.ninja_root.joinpath("format.ninja"), writer.getvalue()
+    )
 
 
 def final_format_targets(
-    stream: TextIO, by_kind: dict[str, list[str]]
+    writer: NinjaWriter, by_kind: dict[str, list[str]]
 ) -> None:
     """Create final, highest-level format targets."""
 
     for target, deps in by_kind.items():
         if deps:
-            stream.write(linesep)
-
-            line = f"build {target}: phony "
-            offset = " " * len(line)
-
-            stream.write(line)
-            stream.write(deps[0])
-            for dep in deps[1:]:  # pragma: nocover
-                write_continuation(stream, offset)
-                stream.write(dep)
-
-            stream.write(linesep)
+            writer.line()
+            writer.build(target, "phony", deps)
 
 
 def write_format_target(
-    stream: TextIO, paths: Iterable[Path], suffix: str, root: Path = None
+    writer: NinjaWriter, paths: Iterable[Path], suffix: str, root: Path = None
 ) -> None:
     """
     Write rules and targets for running clang-format on first-party sources
@@ -63,12 +56,13 @@ def write_format_target(
     cmd = f"clang-format{suffix}"
 
     # Actually formats sources.
-    stream.write("rule clang-format" + linesep)
-    stream.write(f"  command = {cmd} -i $in" + linesep + linesep)
+    writer.line("rule clang-format")
+    writer.line(f"  command = {cmd} -i $in")
+    writer.line()
 
     # Just checks formatting.
-    stream.write("rule clang-format-check" + linesep)
-    stream.write(f"  command = {cmd} -n --Werror $in" + linesep)
+    writer.line("rule clang-format-check")
+    writer.line(f"  command = {cmd} -n --Werror $in")
 
     targets = [("format", ""), ("format-check", "-check")]
     by_kind: dict[str, list[str]] = {"format": [], "format-check": []}
@@ -76,25 +70,16 @@ def write_format_target(
     # Write format rules in groups of files to ensure command-line invocations
     # don't get too long.
     for idx, group in enumerate(batched(paths, 64)):
+        sources = [
+            str(source if root is None else rel(source, base=root))
+            for source in group
+        ]
+
         for kind, sfx in targets:
-            stream.write(linesep)
+            writer.line()
             target = f"format-{idx}{sfx}"
             by_kind[kind].append(target)
-            line = f"build {target}: clang-format{sfx} "
-            offset = " " * len(line)
-
-            stream.write(line)
-            stream.write(
-                str(group[0] if root is None else rel(group[0], base=root))
-            )
-
-            for source in group[1:]:
-                write_continuation(stream, offset)
-                stream.write(
-                    str(source if root is None else rel(source, base=root))
-                )
-
-            stream.write(linesep)
+            writer.build(target, f"clang-format{sfx}", sources)
 
     # Create final target.
-    final_format_targets(stream, by_kind)
+    final_format_targets(writer, by_kind)
@@ -0,0 +1,85 @@
+"""
+A module implementing a buffered writer for ninja syntax.
+"""
+
+# built-in
+from os import linesep
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CONTINUATION = " $" + linesep
+
+
+class NinjaWriter:
+    """
+    A class for building ninja-file contents in memory (output is only joined
+    once, when requested).
+    """
+
+    def __init__(self) -> None:
+        """Initialize this instance."""
+
+        self.chunks: List[str] = []
+
+        # Converting paths to strings (and changing their suffix) is
+        # expensive, and the same paths are often written many times.
+        self.paths: Dict[Tuple[Path, Optional[str]], str] = {}
+
+        # Continuation strings by alignment width.
+        self.offsets: Dict[int, str] = {}
+
+    def getvalue(self) -> str:
+        """Get the written contents."""
+
+        result = "".join(self.chunks)
+        self.chunks = [result]
+        return result
+
+    def write(self, data: str) -> None:
+        """Write data."""
+        self.chunks.append(data)
+
+    def line(self, data: str = "") -> None:
+        """Write a line."""
+        self.chunks.append(data + linesep)
+
+    def path(self, path: Path, suffix: str = None) -> str:
+        """Get a path (optionally with a different suffix) as a string."""
+
+        key = (path, suffix)
+        result = self.paths.get(key)
+        if result is None:
+            result = str(path if suffix is None else path.with_suffix(suffix))
+            self.paths[key] = result
+        return result
+
+    def continuation(self, width: int) -> str:
+        """Get a line continuation that aligns the next line to a width."""
+
+        result = self.offsets.get(width)
+        if result is None:
+            result = CONTINUATION + " " * width
+            self.offsets[width] = result
+        return result
+
+    def aligned(
+        self, prefix: str, items: Iterable[str], suffix: str = linesep
+    ) -> None:
+        """
+        Write items (one per line, aligned after the prefix) followed by a
+        suffix.
+        """
+
+        self.chunks.append(
+            prefix + self.continuation(len(prefix)).join(items) + suffix
+        )
+
+    def build(
+        self,
+        outputs: str,
+        rule: str,
+        inputs: Iterable[str],
+        suffix: str = linesep,
+    ) -> None:
+        """Write a build statement."""
+        self.aligned(f"build {outputs}: {rule} ", inputs, suffix=suffix)
@@ -10,16 +10,23 @@ from yambs.config.common import CommonConfig
 from yambs.generate.common import render_template
 
 
-def generate(jinja: Environment, config: CommonConfig) -> None:
-    """Generate toolchain-related ninja files."""
+def generate(jinja: Environment, config: CommonConfig) -> int:
+    """
+    Generate toolchain-related ninja files (return the number of files
+    written).
+    """
+
+    written = 0
 
     for name, data in config.data["toolchains"].items():
         toolchains_root = config.ninja_root.joinpath("toolchains", name)
         toolchains_root.mkdir(parents=True, exist_ok=True)
 
-        render_template(
+        written += render_template(
             jinja,
             toolchains_root,
             "toolchain.ninja",
             data,
         )
+
+    return written
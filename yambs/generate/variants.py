@@ -31,17 +31,17 @@ def modified_variant_data(
     orig_c = data["extra_cflags"]
     orig_ld = data["extra_ldflags"]
 
-    # Process cflag groups.
-    flags = set(orig_c + cflag_groups.get(name, []))
+    # Process cflag groups (de-duplicating flags while keeping their order).
+    flags = dict.fromkeys(orig_c + cflag_groups.get(name, []))
     for group in data["cflag_groups"]:
-        flags |= set(cflag_groups[group])
-    data["extra_cflags"] = flags
+        flags.update(dict.fromkeys(cflag_groups[group]))
+    data["extra_cflags"] = list(flags)
 
     # Process ldflag groups.
-    flags = set(orig_ld + ldflag_groups.get(name, []))
+    flags = dict.fromkeys(orig_ld + ldflag_groups.get(name, []))
     for group in data["ldflag_groups"]:
-        flags |= set(ldflag_groups[group])
-    data["extra_ldflags"] = flags
+        flags.update(dict.fromkeys(ldflag_groups[group]))
+    data["extra_ldflags"] = list(flags)
 
     # Add other useful data.
     data["name"] = name
@@ -59,8 +59,13 @@ def generate(
     config: CommonConfig,
     cflag_groups: FlagGroups,
     ldflag_groups: FlagGroups,
-) -> None:
-    """Generate variant-related ninja files."""
+) -> int:
+    """
+    Generate variant-related ninja files (return the number of files
+    written).
+    """
+
+    written = 0
 
     for name, data in config.data["variants"].items():
         if data["enabled"]:
@@ -69,9 +74,11 @@ def generate(
             with modified_variant_data(
                 name, data, cflag_groups, ldflag_groups
             ):
-                render_template(
+                written += render_template(
                     jinja,
                     variants_root,
                     "variant.ninja",
                     data,
                 )
+
+    return written
@@ -4,14 +4,15 @@ A module for working with GitHub releases.
 
 # built-in
 import os
+from time import sleep
 from typing import Any, Dict
 from urllib.parse import ParseResult
 
 # third-party
-import requests
 from vcorelib.dict.codec import BasicDictCodec as _BasicDictCodec
 
 # internal
+from yambs.github.session import get_json
 from yambs.schemas import YambsDictCodec as _YambsDictCodec
 
 GIHTUB_HEADERS = {
@@ -81,26 +82,31 @@ def release_data(
     *args,
     version: str = DEFAULT_RELEASE,
     timeout: float = None,
+    tries: int = 5,
+    backoff: float = 0.5,
     **kwargs,
 ) -> ReleaseData:
-    """Get latest-release data."""
+    """
+    Get latest-release data (connections are pooled and responses are cached,
+    see 'yambs.github.session').
+    """
 
     check_api_token()
 
     result: ReleaseData = {}
-
-    # codecov was bugging out.
-    tries = kwargs.get("tries", 5)
-
-    while not validate_release(result) and tries:
-        result = requests.get(
-            repo_release_api_url(owner, repo, version=version),
-            *args,
-            timeout=timeout,
-            headers=GIHTUB_HEADERS,
-            **kwargs,
-        ).json()
-        tries -= 1
+    url = repo_release_api_url(owner, repo, version=version)
+
+    # Transient HTTP errors are retried by the session, but a successful
+    # response may still not contain release data (e.g. when rate limited).
+    for attempt in range(tries):
+        if attempt:
+            sleep(backoff * 2 ** (attempt - 1))
+
+        result = get_json(
+            url, *args, timeout=timeout, headers=GIHTUB_HEADERS, **kwargs
+        )
+        if validate_release(result):
+            break
 
     assert validate_release(result), result
 
@@ -0,0 +1,108 @@
+"""
+A module implementing a shared (connection-pooling) HTTP session and a
+conditional-request cache for JSON API responses.
+"""
+
+# built-in
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# third-party
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from vcorelib.io import ARBITER
+
+# internal
+from yambs.paths import encode_if_changed, user_cache_dir
+
+# Retry transient failures (with exponential backoff).
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET", "HEAD"),
+    respect_retry_after_header=True,
+)
+
+
+@lru_cache(maxsize=1)
+def session(pool_size: int = 16) -> requests.Session:
+    """Get a shared HTTP session (connections are re-used between requests)."""
+
+    result = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=RETRY
+    )
+    result.mount("https://", adapter)
+    result.mount("http://", adapter)
+    return result
+
+
+def response_cache_path(url: str) -> Path:
+    """Get the path to cached response data for a URL."""
+
+    return user_cache_dir("http").joinpath(
+        f"{sha256(url.encode()).hexdigest()[:32]}.json"
+    )
+
+
+def load_cached_response(path: Path) -> Optional[Dict[str, Any]]:
+    """Load cached response data (if there is any)."""
+
+    if not path.is_file():
+        return None
+
+    result = ARBITER.decode(path)
+    return result.data if result.success else None
+
+
+def get_json(
+    url: str,
+    *args,
+    timeout: float = None,
+    headers: Dict[str, str] = None,
+    cache: bool = True,
+    **kwargs,
+) -> Any:
+    """
+    Get JSON data from a URL. Responses are cached (by 'ETag' or
+    'Last-Modified') so that repeated requests for the same resource only
+    cost a '304 Not Modified' response.
+    """
+
+    request_headers = dict(headers or {})
+
+    path = response_cache_path(url)
+    cached = load_cached_response(path) if cache else None
+
+    if cached is not None:
+        if cached.get("etag"):
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = session().get(
+        url, *args, timeout=timeout, headers=request_headers, **kwargs
+    )
+
+    if cached is not None and response.status_code == 304:
+        return cached["data"]
+
+    data = response.json()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if cache and response.ok and (etag or last_modified):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            encode_if_changed(
+                path,
+                {"etag": etag, "last_modified": last_modified, "data": data},
+            )
+        except OSError:
+            pass
+
+    return data
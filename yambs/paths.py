@@ -3,14 +3,29 @@ A module implementing some file-system path utilities.
 """
 
 # built-in
+from io import StringIO
+from os import chmod, environ, getpid, replace
 from pathlib import Path
+import re
+from stat import S_IMODE
+from threading import get_ident
+from typing import Dict, Iterable, List, Optional
 
 # third-party
-from vcorelib.paths import Pathlike, normalize
+from vcorelib import DEFAULT_ENCODING
+from vcorelib.io import ARBITER
+from vcorelib.io.types import JsonObject
+from vcorelib.paths import Pathlike, normalize, stats
 
 # internal
+from yambs import PKG_NAME
 from yambs.translation import BUILD_DIR_PATH
 
+# Files (or directories) modified this recently aren't trusted by caches
+# keyed on modification time (a subsequent change within the same
+# modification-time tick wouldn't be detectable).
+RACY_WINDOW_NS = 2_000_000_000
+
 
 def resolve_build_dir(build_root: Path, variant: str, path: Path) -> Path:
     """Resolve the build-directory variable in a path."""
@@ -22,3 +37,132 @@ def combine_if_not_absolute(root: Path, candidate: Pathlike) -> Path:
 
     candidate = normalize(candidate)
     return candidate if candidate.is_absolute() else root.joinpath(candidate)
+
+
+def user_cache_dir(*parts: str) -> Path:
+    """
+    Get a per-user cache directory for this package (respecting
+    XDG_CACHE_HOME).
+    """
+
+    root = environ.get("XDG_CACHE_HOME")
+    return Path(root if root else Path.home().joinpath(".cache")).joinpath(
+        PKG_NAME, *parts
+    )
+
+
+def sorted_paths(paths: Iterable[Path]) -> List[Path]:
+    """
+    Sort paths (by their string representation, which is much cheaper than
+    comparing path objects).
+    """
+    return sorted(paths, key=str)
+
+
+def write_if_changed(path: Path, content: str | bytes) -> bool:
+    """
+    Write a file only if its contents would change (the file is replaced
+    atomically so that readers never observe partial contents). Return
+    whether or not the file was written.
+    """
+
+    data = (
+        content.encode(DEFAULT_ENCODING)
+        if isinstance(content, str)
+        else content
+    )
+
+    # Only read the existing file if its size matches.
+    stat = stats(path)
+    if (
+        stat is not None
+        and stat.st_size == len(data)
+        and path.read_bytes() == data
+    ):
+        return False
+
+    # Threads (as well as processes) may write the same file concurrently.
+    tmp = path.with_name(f".{path.name}.{getpid()}.{get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+
+        # Keep the existing file's permissions.
+        if stat is not None:
+            chmod(tmp, S_IMODE(stat.st_mode))
+
+        replace(tmp, path)
+    finally:
+        # Don't leave the temporary file behind if anything failed.
+        tmp.unlink(missing_ok=True)
+
+    return True
+
+
+def encode_if_changed(path: Path, data: JsonObject, **kwargs) -> bool:
+    """Encode data to a file only if the file's contents would change."""
+
+    with StringIO() as stream:
+        result = ARBITER.encode_stream(path.suffix[1:], stream, data, **kwargs)
+        assert result[0], path
+        return write_if_changed(path, stream.getvalue())
+
+
+def loaded_files(
+    inputs: Iterable[Path], files_loaded: Iterable[Path]
+) -> List[Path]:
+    """
+    Get the files that data was decoded from: the top-level inputs followed
+    by any included files. Some versions of 'vcorelib' also record includes
+    by their raw (relative to the including file) name, which can't be
+    located afterwards, so only absolute include paths are kept.
+    """
+
+    result: Dict[Path, Path] = {}
+    for path in inputs:
+        result.setdefault(path.resolve(), path)
+    for path in files_loaded:
+        if path.is_absolute():
+            result.setdefault(path.resolve(), path)
+
+    return list(result.values())
+
+
+def depfile_path(path: Path) -> Path:
+    """Get the path to the (Makefile-syntax) dependency file for an output."""
+    return path.with_name(path.name + ".d")
+
+
+def write_depfile(target: Pathlike, inputs: Iterable[Path]) -> bool:
+    """Write a dependency file (for ninja) for an output."""
+
+    def escape(path: Pathlike) -> str:
+        """Escape a path for Makefile syntax."""
+        return str(path).replace(" ", "\\ ").replace("$", "$$")
+
+    target = normalize(target)
+    return write_if_changed(
+        depfile_path(target),
+        f"{escape(target)}: "
+        + " \\\n  ".join(escape(x) for x in inputs)
+        + "\n",
+    )
+
+
+def read_depfile(path: Path) -> Optional[List[Path]]:
+    """
+    Read the inputs from a dependency file written by 'write_depfile' (None if
+    the file doesn't exist).
+    """
+
+    depfile = depfile_path(path)
+    if not depfile.is_file():
+        return None
+
+    contents = depfile.read_text(encoding=DEFAULT_ENCODING)
+    _, inputs = re.split(r"(?<!\\): ", contents, maxsplit=1)
+
+    return [
+        Path(x.replace("\\ ", " ").replace("$$", "$"))
+        for x in re.split(r"(?<!\\)\s+", inputs.replace("\\\n", " "))
+        if x
+    ]
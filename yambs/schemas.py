@@ -3,16 +3,183 @@ A module for working with schemas belonging to this package.
 """
 
 # built-in
+from hashlib import sha256
+import marshal
+from pathlib import Path
+from sys import implementation
+from types import CodeType
+from typing import Any as _Any
 from typing import Optional as _Optional
 
 # third-party
+from fastjsonschema import compile_to_code  # type: ignore
 from vcorelib.dict.codec import DictCodec as _DictCodec
-from vcorelib.io import DEFAULT_INCLUDES_KEY
+from vcorelib.io import ARBITER, DEFAULT_INCLUDES_KEY
+from vcorelib.io.types import JsonObject as _JsonObject
+from vcorelib.paths import resource
+from vcorelib.schemas.base import Schema as _Schema
 from vcorelib.schemas.base import SchemaMap as _SchemaMap
+from vcorelib.schemas.json import JsonSchema as _JsonSchema
 from vcorelib.schemas.json import JsonSchemaMap as _JsonSchemaMap
+from vcorelib.schemas.json import package_handler
 
 # internal
-from yambs import PKG_NAME
+from yambs import PKG_NAME, VERSION
+from yambs.paths import user_cache_dir, write_if_changed
+
+
+class CompiledJsonSchema(_JsonSchema):
+    """A JSON schema created from already-generated validation code."""
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, data: _JsonObject, code: CodeType, **_
+    ) -> None:
+        """Initialize this schema."""
+
+        # pylint: disable=non-parent-init-called
+        _Schema.__init__(self, data)
+
+        namespace: dict[str, _Any] = {}
+        exec(code, namespace)  # pylint: disable=exec-used
+        self.validator = namespace["validate"]
+
+
+class PassthroughSchema(_Schema):
+    """A schema for data that has already been validated."""
+
+    def __call__(self, data: _Any) -> _Any:
+        """Return the input data as-is."""
+        return data
+
+
+class TrustedSchemaMap(_SchemaMap):
+    """
+    A schema map for creating objects from data that was already validated
+    (every schema passes data through).
+    """
+
+    @classmethod
+    def kind(cls) -> type[_Schema]:
+        """Get the concrete schema type."""
+        return PassthroughSchema
+
+    def __contains__(self, key: object) -> bool:
+        """Every schema is available."""
+        return True
+
+    def __missing__(self, key: str) -> _Schema:
+        """Create schemas on demand."""
+
+        schema = PassthroughSchema({})
+        self.data[key] = schema
+        return schema
+
+
+TRUSTED_SCHEMAS = TrustedSchemaMap()
+
+
+class PackageSchemaMap(_JsonSchemaMap):
+    """
+    A schema map that only loads (and compiles) package schemas when they're
+    requested. Compiled schemas are optionally persisted to a cache directory.
+    """
+
+    def __init__(
+        self,
+        package: str,
+        cache: Path = None,
+        includes_key: str = DEFAULT_INCLUDES_KEY,
+    ) -> None:
+        """Initialize this instance."""
+
+        super().__init__()
+
+        root = resource("schemas", package=package)
+        assert root is not None, f"No schemas for package '{package}'!"
+        self.root = root
+
+        self.cache = cache
+        self.includes_key = includes_key
+        self._digest: _Optional[str] = None
+
+    def __contains__(self, key: object) -> bool:
+        """Determine if this map has (or can load) a schema."""
+        return key in self.data or self.root.joinpath(f"{key}.yaml").is_file()
+
+    def __missing__(self, key: str) -> _JsonSchema:
+        """Load a schema that hasn't been requested yet."""
+
+        if key not in self:
+            raise KeyError(key)
+
+        code = None
+        cached = self.cache_path(key)
+        if cached is not None and cached.is_file():
+            try:
+                data, code = marshal.loads(cached.read_bytes())
+                if not isinstance(code, CodeType):
+                    raise TypeError(f"Not code: {code}")
+            except (EOFError, ValueError, TypeError):
+                # Discard truncated (or otherwise unusable) entries.
+                code = None
+                cached.unlink(missing_ok=True)
+
+        if code is None:
+            data = ARBITER.decode(
+                self.root.joinpath(f"{key}.yaml"),
+                includes_key=self.includes_key,
+                require_success=True,
+            ).data
+            code = compile(
+                compile_to_code(data, handlers={"package": package_handler}),
+                f"<schema '{key}'>",
+                "exec",
+            )
+            if cached is not None:
+                write_if_changed(cached, marshal.dumps((data, code)))
+
+        schema = CompiledJsonSchema(data, code)
+        self.data[key] = schema
+        return schema
+
+    @property
+    def digest(self) -> str:
+        """Get a digest of this package's schema sources."""
+
+        if self._digest is None:
+            # Schemas can include (or reference) any other schema file.
+            hasher = sha256()
+            for path in sorted(self.root.iterdir()):
+                hasher.update(path.name.encode())
+                hasher.update(path.read_bytes())
+            self._digest = hasher.hexdigest()
+
+        return self._digest
+
+    def cache_path(self, key: str) -> _Optional[Path]:
+        """
+        Get the path to a persisted, compiled schema (or None if the cache
+        isn't usable).
+        """
+
+        if self.cache is None:
+            return None
+
+        try:
+            self.cache.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            self.cache = None
+            return None
+
+        # Compiled code is only valid for the same interpreter version.
+        return self.cache.joinpath(
+            f"{key}-{implementation.cache_tag}-{self.digest[:16]}.marshal"
+        )
+
+
+PACKAGE_SCHEMAS = PackageSchemaMap(
+    PKG_NAME, cache=user_cache_dir("schemas", VERSION)
+)
 
 
 class YambsDictCodec(_DictCodec):
@@ -20,7 +187,4 @@ class YambsDictCodec(_DictCodec):
     A simple wrapper for package classes that want to implement DictCodec.
     """
 
-    default_schemas: _Optional[_SchemaMap] = _JsonSchemaMap.from_package(
-        PKG_NAME,
-        includes_key=DEFAULT_INCLUDES_KEY,
-    )
+    default_schemas: _Optional[_SchemaMap] = PACKAGE_SCHEMAS
@@ -7,7 +7,7 @@ outputs.
 from functools import lru_cache
 from os import linesep
 from pathlib import Path
-from typing import NamedTuple, Optional, TextIO
+from typing import NamedTuple, Optional
 
 HEADER_EXTENSIONS = {".h", ".hpp"}
 BUILD_DIR_VAR = "$build_dir"
@@ -45,25 +45,25 @@ class SourceTranslator(NamedTuple):
         """Determine if this translation produces a header file."""
         return self.output_extension in HEADER_EXTENSIONS
 
-    def write(
+    def statements(
         self,
-        stream: TextIO,
         out: Path,
         source: str,
         rule: str = "build",
         wasm: bool = False,
-    ) -> None:
-        """Write a ninja rule to the stream."""
+    ) -> str:
+        """Get the ninja statements for translating a source."""
 
-        stream.write(f"{rule} {out}: {self.rule} {source}")
-        stream.write(linesep)
+        result = f"{rule} {out}: {self.rule} {source}" + linesep
 
         # Also add a '.wasm' variant.
         if wasm:
-            stream.write(
-                (f"build {out.with_suffix('.wasm')}: " f"{self.rule} {source}")
+            result += (
+                f"build {out.with_suffix('.wasm')}: {self.rule} {source}"
+                + linesep
             )
-            stream.write(linesep)
+
+        return result
 
 
 DEFAULT = SourceTranslator()
@@ -5,14 +5,19 @@ See https://github.com/microsoft/uf2.
 """
 
 # built-in
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from functools import lru_cache
+from io import BytesIO
+import mmap
 import os
 import os.path
+from pathlib import Path
 import re
 import struct
 import subprocess
 import sys
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 # third-party
 from vcorelib.io import ARBITER
@@ -34,6 +39,9 @@ FAMILYID = 0x0
 def is_uf2(buf: bytes) -> bool:
     """Checks whether or not the provided buffer has the header magic bytes."""
 
+    if len(buf) < 8:
+        return False
+
     header = struct.unpack("<II", buf[0:8])
     return bool(header[0] == UF2_MAGIC_START0) and bool(
         header[1] == UF2_MAGIC_START1
@@ -73,42 +81,63 @@ def convert_to_carray(file_content: bytes) -> bytes:
     return bytes(outp, "utf-8")
 
 
-def convert_to_uf2(file_content: bytes) -> bytes:
-    """Convert a file to uf2."""
+UF2_BLOCK_SIZE = 512
+UF2_PAYLOAD_SIZE = 256
+UF2_FLAG_FAMILY_ID = 0x2000
 
-    assert APPSTARTADDR is not None
+# A complete block: header, payload (zero padded), padding and final magic.
+UF2_BLOCK = struct.Struct(
+    f"<8I{UF2_PAYLOAD_SIZE}s{UF2_BLOCK_SIZE - 32 - UF2_PAYLOAD_SIZE - 4}xI"
+)
+
+
+def encode_uf2(data: bytes, start_addr: int, family_id: int = 0x0) -> bytes:
+    """
+    Encode a binary image (to be written at a starting address) as UF2
+    blocks. The output is allocated once and each block (including its
+    payload) is packed in place with a single call.
+    """
+
+    numblocks = (len(data) + UF2_PAYLOAD_SIZE - 1) // UF2_PAYLOAD_SIZE
+    flags = UF2_FLAG_FAMILY_ID if family_id else 0x0
+
+    result = bytearray(numblocks * UF2_BLOCK_SIZE)
+    pack_into = UF2_BLOCK.pack_into
 
-    datapadding = b""
-    while len(datapadding) < 512 - 256 - 32 - 4:
-        datapadding += b"\x00\x00\x00\x00"
-    numblocks = (len(file_content) + 255) // 256
-    outp = []
     for blockno in range(numblocks):
-        ptr = 256 * blockno
-        chunk = file_content[ptr : ptr + 256]
-        flags = 0x0
-        if FAMILYID:
-            flags |= 0x2000
-
-        header = struct.pack(
-            b"<IIIIIIII",
+        ptr = blockno * UF2_PAYLOAD_SIZE
+        pack_into(
+            result,
+            blockno * UF2_BLOCK_SIZE,
             UF2_MAGIC_START0,
             UF2_MAGIC_START1,
             flags,
-            ptr + APPSTARTADDR,
-            256,
+            ptr + start_addr,
+            UF2_PAYLOAD_SIZE,
             blockno,
             numblocks,
-            FAMILYID,
-        )
-        while len(chunk) < 256:
-            chunk += b"\x00"
-        block = (
-            header + chunk + datapadding + struct.pack(b"<I", UF2_MAGIC_END)
+            family_id,
+            data[ptr : ptr + UF2_PAYLOAD_SIZE],
+            UF2_MAGIC_END,
         )
-        assert len(block) == 512
-        outp.append(block)
-    return b"".join(outp)
+
+    return bytes(result)
+
+
+def convert_to_uf2(file_content: bytes) -> bytes:
+    """Convert a file to uf2 (using the module's address and family)."""
+
+    assert APPSTARTADDR is not None
+    return encode_uf2(file_content, APPSTARTADDR, FAMILYID)
+
+
+class Conversion(NamedTuple):
+    """The result of converting (or decoding) data."""
+
+    size: int
+
+    # The application's start address (if it could be determined).
+    start_addr: Optional[int]
 
 
 class Block:
@@ -118,51 +147,42 @@ class Block:
         """Initialize this instance."""
 
         self.addr = addr
-        self.bytes = bytearray(256)
+        self.bytes = bytearray(UF2_PAYLOAD_SIZE)
 
-    def encode(self, blockno: int, numblocks: int) -> bytes:
+    def encode(self, blockno: int, numblocks: int, family_id: int) -> bytes:
         """Encode a block."""
 
-        flags = 0x0
-        if FAMILYID:
-            flags |= 0x2000
-
-        header = struct.pack(
-            "<IIIIIIII",
+        return UF2_BLOCK.pack(
             UF2_MAGIC_START0,
             UF2_MAGIC_START1,
-            flags,
+            UF2_FLAG_FAMILY_ID if family_id else 0x0,
             self.addr,
-            256,
+            UF2_PAYLOAD_SIZE,
             blockno,
             numblocks,
-            FAMILYID,
+            family_id,
+            self.bytes,
+            UF2_MAGIC_END,
         )
-        header += self.bytes[0:256]
-        while len(header) < 512 - 4:
-            header += b"\x00"
-        header += struct.pack("<I", UF2_MAGIC_END)
-        return header
 
 
-def convert_from_hex_to_uf2(buf: str) -> bytes:
-    """Create uf2 bytes from hex data."""
+def encode_hex(buf: str, family_id: int = 0x0) -> Tuple[bytes, Optional[int]]:
+    """
+    Create uf2 bytes from hex data (and get the start address of the
+    first data record). Records are decoded whole and their payloads are
+    copied into (address-aligned) blocks, which are emitted in address
+    order (records don't need to be).
+    """
 
-    global APPSTARTADDR  # pylint: disable=global-statement
-    APPSTARTADDR = None
+    start_addr = None
 
     upper = 0
-    currblock = None
-    blocks = []
-    for line in buf.split("\n"):
-        if line[0] != ":":  # pragma: nocover
+    blocks: Dict[int, Block] = {}
+    for line in buf.splitlines():
+        if not line.startswith(":"):
             continue
 
-        i = 1
-        rec = []
-        while i < len(line) - 1:
-            rec.append(int(line[i : i + 2], 16))
-            i += 2
+        rec = bytes.fromhex(line[1:])
 
         tp_val = rec[3]
         if tp_val == 4:
@@ -173,21 +193,127 @@ def convert_from_hex_to_uf2(buf: str) -> bytes:
             break
         elif tp_val == 0:
             addr = upper + ((rec[1] << 8) | rec[2])
-            if APPSTARTADDR is None:
-                APPSTARTADDR = addr
-            i = 4
-            while i < len(rec) - 1:
-                if not currblock or currblock.addr & ~0xFF != addr & ~0xFF:
-                    currblock = Block(addr & ~0xFF)
-                    blocks.append(currblock)
-                currblock.bytes[addr & 0xFF] = rec[i]
-                addr += 1
-                i += 1
+            if start_addr is None:
+                start_addr = addr
+
+            # Payload (without the trailing checksum), which may span blocks.
+            data = memoryview(rec)[4:-1]
+            while data:
+                base = addr & ~0xFF
+                offset = addr & 0xFF
+
+                block = blocks.get(base)
+                if block is None:
+                    block = Block(base)
+                    blocks[base] = block
+
+                count = min(len(data), UF2_PAYLOAD_SIZE - offset)
+                block.bytes[offset : offset + count] = data[:count]
+
+                addr += count
+                data = data[count:]
+
     numblocks = len(blocks)
-    resfile = b""
-    for i in range(0, numblocks):
-        resfile += blocks[i].encode(i, numblocks)
-    return resfile
+    return (
+        b"".join(
+            block.encode(blockno, numblocks, family_id)
+            for blockno, (_, block) in enumerate(sorted(blocks.items()))
+        ),
+        start_addr,
+    )
+
+
+def convert_from_hex_to_uf2(buf: str) -> bytes:
+    """Create uf2 bytes from hex data (using the module's family)."""
+
+    global APPSTARTADDR  # pylint: disable=global-statement
+
+    result, APPSTARTADDR = encode_hex(buf, FAMILYID)
+    return result
+
+
+def convert_file(
+    path: str, output: str, start_addr: int = 0x2000, family_id: int = 0x0
+) -> Conversion:
+    """
+    Convert a HEX or binary file (binary files are written at a starting
+    address) to UF2. This doesn't depend on any module state, so it's safe
+    to call concurrently.
+    """
+
+    with open(path, mode="rb") as path_fd:
+        data = path_fd.read()
+
+    # Don't wrap UF2 images again.
+    if is_uf2(data):
+        raise ValueError(f"'{path}' is already UF2!")
+
+    start: Optional[int] = start_addr
+    if is_hex(data):
+        result, start = encode_hex(data.decode("utf-8"), family_id)
+    else:
+        result = encode_uf2(data, start_addr, family_id)
+
+    with open(output, "wb") as output_fd:
+        output_fd.write(result)
+
+    return Conversion(len(result), start)
+
+
+# Files are converted in parallel by default.
+DEFAULT_CONVERT_JOBS = 4
+
+
+def address_str(addr: Optional[int]) -> str:
+    """Get a printable (hexadecimal) address, which may be unknown."""
+    return "none" if addr is None else f"0x{addr:x}"
+
+
+def convert_files(
+    paths: Iterable[Tuple[str, str]],
+    start_addr: int = 0x2000,
+    family_id: int = 0x0,
+    jobs: int = DEFAULT_CONVERT_JOBS,
+) -> List[Conversion]:
+    """
+    Convert many HEX or binary files (pairs of input and output paths) to
+    UF2 concurrently. Results are in the same order as the inputs.
+    """
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        return [
+            future.result()
+            for future in [
+                executor.submit(convert_file, src, dst, start_addr, family_id)
+                for src, dst in paths
+            ]
+        ]
+
+
+def manifest_images(path: Path) -> List[Path]:
+    """
+    Get the HEX images of built applications listed in an application
+    manifest ('apps.json' or 'board_apps.json').
+    """
+
+    data: Dict[str, Any] = ARBITER.decode(path, require_success=True).data
+
+    # Native manifests list each application's variants, board manifests
+    # list each board's applications.
+    if "all" in data:
+        apps = [
+            x for app in data["all"].values() for x in app["variants"].values()
+        ]
+    else:
+        apps = [x for board in data.values() for x in board.values()]
+
+    return [
+        hex_path
+        for hex_path in dict.fromkeys(
+            Path(x).with_suffix(".hex") for x in apps
+        )
+        if hex_path.is_file()
+    ]
 
 
 def to_str(data: bytes) -> str:
@@ -258,11 +384,12 @@ def write_file(name: str, buf: bytes) -> None:
     print(f"Wrote {len(buf)} bytes to {name}")
 
 
+@lru_cache(maxsize=1)
 def load_families() -> Dict[str, int]:
     """
-    The expectation is that the `uf2families.json` file is in the same
-    directory as this script. Make a path that works using `__file__`
-    which contains the full path to this script.
+    Load family identifiers (by short name) from the package's
+    'uf2families.json' resource. The result is cached (and shouldn't be
+    modified).
     """
 
     raw_families = ARBITER.decode(
@@ -276,108 +403,162 @@ def load_families() -> Dict[str, int]:
     return families
 
 
+UF2_HEADER = struct.Struct("<8I")
+
+
+def print_uf2_info(
+    families_found: Dict[int, int], flags: Optional[int]
+) -> None:
+    """Print a summary of a decoded UF2 file's headers."""
+
+    print("--- UF2 File Header Info ---")
+
+    names = {value: name for name, value in load_families().items()}
+    for family_hex, data in families_found.items():
+        print(
+            (
+                f"Family ID is {names.get(family_hex, ''):s}, "
+                f"hex value is 0x{family_hex:08x}"
+            )
+        )
+        print(f"Target Address is 0x{data:08x}")
+    if flags is not None:
+        print(f"All block flag values consistent, 0x{flags:04x}")
+    else:  # pragma: nocover
+        print("Flags were not all the same")
+    print("----------------------------")
+
+
 # pylint: disable=too-many-statements,too-many-locals,too-many-branches
-def convert_from_uf2(
-    buf: bytes,
-) -> bytes:
-    """Convert a uf2-formatted file into a regular one."""
+def decode_uf2(
+    buf: Any,
+    output: IO[bytes] = None,
+    family_id: int = 0x0,
+    start_addr: int = None,
+) -> Conversion:
+    """
+    Decode a UF2-formatted buffer (anything supporting the buffer protocol,
+    e.g. a memory-mapped file) without copying it, writing payload data
+    (for a family, or all data if it's zero) to an output stream (if
+    provided).
+    """
 
-    global APPSTARTADDR  # pylint: disable=global-statement
+    start = output.tell() if output is not None else 0
+    size = 0
 
-    numblocks = len(buf) // 512
+    numblocks = len(buf) // UF2_BLOCK_SIZE
     curraddr = None
     currfamilyid = None
-    families_found: Dict[Any, Any] = {}
+    families_found: Dict[int, int] = {}
     prev_flag = None
     all_flags_same = True
-    outp: List[Any] = []
 
-    for blockno in range(numblocks):
-        ptr = blockno * 512
-        block = buf[ptr : ptr + 512]
-        header = struct.unpack(b"<IIIIIIII", block[0:32])
-
-        if (
-            header[0] != UF2_MAGIC_START0 or header[1] != UF2_MAGIC_START1
-        ):  # pragma: nocover
-            print(f"Skipping block at {ptr}; bad magic")
-            continue
-        if header[2] & 1:  # pragma: nocover
-            # NO-flash flag set; skip block
-            continue
+    with memoryview(buf) as view:
+        for blockno in range(numblocks):
+            ptr = blockno * UF2_BLOCK_SIZE
+            header = UF2_HEADER.unpack_from(view, ptr)
+
+            if (
+                header[0] != UF2_MAGIC_START0 or header[1] != UF2_MAGIC_START1
+            ):  # pragma: nocover
+                print(f"Skipping block at {ptr}; bad magic")
+                continue
+            if header[2] & 1:  # pragma: nocover
+                # NO-flash flag set; skip block
+                continue
+
+            datalen = header[4]
+            if datalen > 476:  # pragma: nocover
+                assert False, f"Invalid UF2 data size at {ptr}"
+            newaddr = header[3]
+
+            has_family = header[2] & UF2_FLAG_FAMILY_ID
+            if has_family and (currfamilyid is None):
+                currfamilyid = header[7]
+
+            if curraddr is None or (has_family and header[7] != currfamilyid):
+                currfamilyid = header[7]
+                curraddr = newaddr
+                if family_id in [0x0, header[7]]:
+                    start_addr = newaddr
+
+            padding = newaddr - curraddr
+
+            checks = [
+                (padding < 0, f"Block out of order at {ptr}"),
+                (
+                    padding > 10 * 1024 * 1024,
+                    f"More than 10M of padding needed at {ptr}",
+                ),
+                (padding % 4 != 0, f"Non-word padding size at {ptr}"),
+            ]
+            for check, msg in checks:
+                assert not check, msg
+
+            if family_id == 0x0 or (has_family and family_id == header[7]):
+                if output is not None:
+                    if padding > 0:  # pragma: nocover
+                        output.write(bytes(padding))
+                    output.write(view[ptr + 32 : ptr + 32 + datalen])
+                size += padding + datalen
+
+            curraddr = newaddr + datalen
+            if has_family:
+                if header[7] in families_found:
+                    if families_found[header[7]] > newaddr:  # pragma: nocover
+                        families_found[header[7]] = newaddr
+                else:
+                    families_found[header[7]] = newaddr
 
-        datalen = header[4]
-        if datalen > 476:  # pragma: nocover
-            assert False, f"Invalid UF2 data size at {ptr}"
-        newaddr = header[3]
+            if prev_flag is None:
+                prev_flag = header[2]
+            if prev_flag != header[2]:  # pragma: nocover
+                all_flags_same = False
 
-        if (header[2] & 0x2000) and (currfamilyid is None):
-            currfamilyid = header[7]
+    if numblocks:
+        print_uf2_info(families_found, prev_flag if all_flags_same else None)
 
-        if curraddr is None or (
-            (header[2] & 0x2000) and header[7] != currfamilyid
-        ):
-            currfamilyid = header[7]
-            curraddr = newaddr
-            if FAMILYID in [0x0, header[7]]:
-                APPSTARTADDR = newaddr
+        if len(families_found) > 1 and family_id == 0x0:  # pragma: nocover
+            if output is not None:
+                output.seek(start)
+                output.truncate()
+            size = 0
+            start_addr = 0x0
 
-        padding = newaddr - curraddr
+    return Conversion(size, start_addr)
 
-        checks = [
-            (padding < 0, f"Block out of order at {ptr}"),
-            (
-                padding > 10 * 1024 * 1024,
-                f"More than 10M of padding needed at {ptr}",
-            ),
-            (padding % 4 != 0, f"Non-word padding size at {ptr}"),
-        ]
-        for check, msg in checks:
-            assert not check, msg
 
-        while padding > 0:  # pragma: nocover
-            padding -= 4
-            outp += b"\x00\x00\x00\x00"
-
-        if FAMILYID == 0x0 or ((header[2] & 0x2000) and FAMILYID == header[7]):
-            outp.append(block[32 : 32 + datalen])
+def decode_uf2_file(
+    path: str,
+    output: str = None,
+    family_id: int = 0x0,
+    start_addr: int = None,
+) -> Conversion:
+    """
+    Convert a uf2-formatted file into a regular one (if an output path is
+    provided). The input is memory mapped and decoded data is written
+    directly to the output, so memory use doesn't depend on file size.
+    """
 
-        curraddr = newaddr + datalen
-        if header[2] & 0x2000:
-            if header[7] in families_found:
-                if families_found[header[7]] > newaddr:  # pragma: nocover
-                    families_found[header[7]] = newaddr
-            else:
-                families_found[header[7]] = newaddr
-
-        if prev_flag is None:
-            prev_flag = header[2]
-        if prev_flag != header[2]:  # pragma: nocover
-            all_flags_same = False
-
-        if blockno == (numblocks - 1):
-            print("--- UF2 File Header Info ---")
-
-            families = load_families()
-            for family_hex, data in families_found.items():
-                family_short_name = ""
-                for name, value in families.items():
-                    if value == family_hex:
-                        family_short_name = name
-                print(
-                    (
-                        f"Family ID is {family_short_name:s}, "
-                        f"hex value is 0x{family_hex:08x}"
-                    )
+    with open(path, mode="rb") as path_fd:
+        with mmap.mmap(path_fd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if output is None:
+                return decode_uf2(
+                    data, family_id=family_id, start_addr=start_addr
                 )
-                print(f"Target Address is 0x{data:08x}")
-            if all_flags_same:
-                print(f"All block flag values consistent, 0x{header[2]:04x}")
-            else:  # pragma: nocover
-                print("Flags were not all the same")
-            print("----------------------------")
-            if len(families_found) > 1 and FAMILYID == 0x0:  # pragma: nocover
-                outp = []
-                APPSTARTADDR = 0x0
-
-    return b"".join(outp)
+
+            with open(output, "wb") as output_fd:
+                return decode_uf2(data, output_fd, family_id, start_addr)
+
+
+def convert_from_uf2(buf: bytes) -> bytes:
+    """
+    Convert a uf2-formatted file into a regular one (using, and updating,
+    the module's address and family).
+    """
+
+    global APPSTARTADDR  # pylint: disable=global-statement
+
+    with BytesIO() as stream:
+        APPSTARTADDR = decode_uf2(buf, stream, FAMILYID, APPSTARTADDR)[1]
+        return stream.getvalue()